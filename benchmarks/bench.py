@@ -0,0 +1,172 @@
+"""Benchmarks for the hot paths of pyrummy.
+Every workload is generated from a fixed seed, hence runs are comparable
+between commits. For each workload, throughput (ops/sec), per-call latency
+percentiles and the peak memory allocated while running it are reported.
+
+Usage:
+    python benchmarks/bench.py [-w WORKLOAD ...] [-e ENGINE] [--json FILE]
+    python benchmarks/bench.py --compare OLD.json NEW.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyrummy.game import Player, Pool, Game
+from pyrummy.batch import ENGINES
+
+
+def _random_hands(rng, count, sizes):
+    hands = []
+    for _ in range(count):
+        pool = list(Pool())
+        rng.shuffle(pool)
+        hands.append(pool[:rng.choice(sizes)])
+    return hands
+
+
+def prepare_play(rng, count, engine):
+    players = []
+    for hand in _random_hands(rng, count, range(14, 21)):
+        player = Player(0, hand, engine=engine)
+        players.append(player)
+    return [player.play for player in players]
+
+
+def prepare_find_drop_chip(rng, count, engine):
+    calls = []
+    for hand in _random_hands(rng, count, range(8, 15)):
+        player = Player(0, hand, engine=engine)
+        calls.append(lambda p=player, h=hand: p._find_drop_chip(h))
+    return calls
+
+
+def prepare_pool(rng, count, engine):
+    pool = Pool(rng=random.Random(rng.random()))
+
+    def draw_and_drop():
+        pool.append(pool.pop_random_chip())
+
+    return count * [draw_and_drop]
+
+
+def prepare_candidates(rng, count, engine):
+    chips = list(Pool())
+    return [rng.choice(chips).candidates for _ in range(count)]
+
+
+def prepare_game(rng, count, engine):
+    games = [Game(4, seed=rng.randrange(2**32), engine=engine)
+            for _ in range(count)]
+    return [game.run for game in games]
+
+
+# name: (prepare function, default number of calls)
+WORKLOADS = {
+        "play": (prepare_play, 2000),
+        "find_drop_chip": (prepare_find_drop_chip, 2000),
+        "pool": (prepare_pool, 100000),
+        "candidates": (prepare_candidates, 100000),
+        "game": (prepare_game, 100),
+        }
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_workload(name, seed, count, engine_class):
+    """Run the workload twice: once timing every call, once tracing memory
+    allocations. Returns a dict of the results."""
+    prepare, default_count = WORKLOADS[name]
+    count = count or default_count
+
+    def calls():
+        engine = None if engine_class is None else engine_class()
+        return prepare(random.Random(seed), count, engine)
+
+    latencies = []
+    timer = time.perf_counter
+    prepared = calls()
+    start = timer()
+    for call in prepared:
+        t = timer()
+        call()
+        latencies.append(timer() - t)
+    total = timer() - start
+
+    prepared = calls()
+    tracemalloc.start()
+    for call in prepared:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+            "calls": count,
+            "ops_per_sec": count / total,
+            "latency_us": {p: 1e6 * percentile(latencies, f) for p, f in
+                (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))},
+            "peak_memory_kb": peak / 1024,
+            }
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)["results"]
+    with open(new_path) as f:
+        new = json.load(f)["results"]
+    print("{:<16}{:>14}{:>14}{:>9}".format("workload", "old ops/s",
+        "new ops/s", "ratio"))
+    for name in sorted(set(old) & set(new)):
+        before, after = old[name]["ops_per_sec"], new[name]["ops_per_sec"]
+        print("{:<16}{:>14.0f}{:>14.0f}{:>8.2f}x".format(name, before, after,
+            after / before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-w", "--workload", nargs="+",
+            choices=sorted(WORKLOADS), default=sorted(WORKLOADS))
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES),
+            default="greedy")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-n", "--count", type=int, default=None,
+            help="number of calls per workload (default: workload specific)")
+    parser.add_argument("--json", metavar="FILE",
+            help="write machine-readable results to FILE")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+            help="compare two result files instead of running benchmarks")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = {}
+    for name in args.workload:
+        result = run_workload(name, args.seed, args.count,
+                ENGINES[args.engine])
+        results[name] = result
+        latency = result["latency_us"]
+        print("{:<16}{:>12.0f} ops/s  p50 {:>9.1f}us  p99 {:>9.1f}us  "
+                "peak {:>8.1f}kB".format(name, result["ops_per_sec"],
+                    latency["p50"], latency["p99"], result["peak_memory_kb"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"engine": args.engine, "seed": args.seed,
+                "python": sys.version.split()[0], "results": results}, f,
+                indent=2)
+
+
+if __name__ == "__main__":
+    main()
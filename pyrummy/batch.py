@@ -0,0 +1,277 @@
+"""Run many seeded games in parallel and aggregate their results.
+Every game is played in a worker process which only sends back a compact
+`GameResult`. The parent process folds the results into `Statistics` as they
+arrive, hence memory usage does not grow with the number of games."""
+
+import argparse
+from collections import namedtuple
+import math
+import multiprocessing
+
+from pyrummy.game import Game, GreedyEngine
+from pyrummy.bitset import BitsetEngine
+from pyrummy.solver import OptimalEngine
+from pyrummy.cache import DecisionCache
+from pyrummy.instruments import Instruments
+from pyrummy.rules import STANDARD, RuleSet, use
+
+
+GameResult = namedtuple("GameResult",
+        "seed winner turns publish_turns hand_values outcome")
+GameResult.__doc__ = """Outcome of a single game. `winner` is the index of the
+winning player (None if the game ended without winner, see `outcome`),
+`turns` the total number of turns played. `publish_turns` and
+`hand_values` hold one entry per player: the turn of first publishing (None if
+the player never published) and the value of the chips left on the hand."""
+
+
+def play_game(seed, nr_players=4, engine=None, cache=None, instruments=None,
+        rules=None, max_turns=None, stalemate_rounds=None):
+    """Run the game generated from `seed` and return its result. If `rules`
+    are given, they override `nr_players`. `max_turns` and
+    `stalemate_rounds` bound the game (see `Game`)."""
+    game = Game(nr_players, seed=seed, engine=engine, cache=cache,
+            instruments=instruments, rules=rules, max_turns=max_turns,
+            stalemate_rounds=stalemate_rounds)
+    game.run()
+    return GameResult(seed, None if game._winner is None else
+            game._winner._index, game._turns,
+            tuple(p._publish_turn for p in game._players),
+            tuple(p.hand_value() for p in game._players), game.outcome)
+
+
+class Statistics(object):
+    """Streaming aggregation of `GameResult`s. Only sums and extremes are
+    stored; two instances can be combined using `merge`. `outcomes` counts
+    the games per `Game.outcome`. If the games were instrumented,
+    `instruments` holds the aggregated `pyrummy.instruments.Instruments`,
+    otherwise None."""
+
+    def __init__(self, nr_players=4):
+        self.nr_players = nr_players
+        self.nr_games = 0
+        self.wins = nr_players * [0]
+        self.outcomes = {}
+        self.min_turns = None
+        self.max_turns = None
+        self._turns_sum = 0
+        self._turns_square_sum = 0
+        self.publications = nr_players * [0]
+        self._publish_turns_sum = nr_players * [0]
+        self._hand_values_sum = nr_players * [0]
+        self.instruments = None
+
+    def add(self, result):
+        self.nr_games += 1
+        if result.winner is not None:
+            self.wins[result.winner] += 1
+        self.outcomes[result.outcome] = self.outcomes.get(result.outcome,
+                0) + 1
+        turns = result.turns
+        self._turns_sum += turns
+        self._turns_square_sum += turns ** 2
+        if self.min_turns is None or turns < self.min_turns:
+            self.min_turns = turns
+        if self.max_turns is None or turns > self.max_turns:
+            self.max_turns = turns
+        for i in range(self.nr_players):
+            if result.publish_turns[i] is not None:
+                self.publications[i] += 1
+                self._publish_turns_sum[i] += result.publish_turns[i]
+            self._hand_values_sum[i] += result.hand_values[i]
+
+    def merge(self, other):
+        if other.nr_players != self.nr_players:
+            raise ValueError("Cannot merge statistics of games with different "
+                    "numbers of players.")
+        if other.instruments is not None:
+            if self.instruments is None:
+                self.instruments = Instruments()
+            self.instruments.merge(other.instruments.snapshot())
+        if other.nr_games == 0:
+            return
+        if self.nr_games == 0:
+            self.min_turns, self.max_turns = other.min_turns, other.max_turns
+        else:
+            self.min_turns = min(self.min_turns, other.min_turns)
+            self.max_turns = max(self.max_turns, other.max_turns)
+        self.nr_games += other.nr_games
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        self._turns_sum += other._turns_sum
+        self._turns_square_sum += other._turns_square_sum
+        for i in range(self.nr_players):
+            self.wins[i] += other.wins[i]
+            self.publications[i] += other.publications[i]
+            self._publish_turns_sum[i] += other._publish_turns_sum[i]
+            self._hand_values_sum[i] += other._hand_values_sum[i]
+
+    # the means and the standard deviation are None without games
+
+    @property
+    def mean_turns(self):
+        if self.nr_games == 0:
+            return None
+        return self._turns_sum / self.nr_games
+
+    @property
+    def std_turns(self):
+        if self.nr_games == 0:
+            return None
+        variance = self._turns_square_sum / self.nr_games -\
+                self.mean_turns ** 2
+        return math.sqrt(max(variance, 0))
+
+    @property
+    def mean_publish_turns(self):
+        """Average turn of first publishing per player, None if the player
+        never published."""
+        return [s / n if n else None for s, n in
+                zip(self._publish_turns_sum, self.publications)]
+
+    @property
+    def mean_hand_values(self):
+        if self.nr_games == 0:
+            return None
+        return [s / self.nr_games for s in self._hand_values_sum]
+
+    def as_dict(self):
+        result = {
+                "games": self.nr_games,
+                "wins": self.wins,
+                "outcomes": self.outcomes,
+                "turns": {"mean": self.mean_turns, "std": self.std_turns,
+                    "min": self.min_turns, "max": self.max_turns},
+                "publications": self.publications,
+                "mean_publish_turns": self.mean_publish_turns,
+                "mean_hand_values": self.mean_hand_values,
+                }
+        if self.instruments is not None:
+            result["instruments"] = self.instruments.report()
+        return result
+
+
+# engine, decision cache, instruments, rules and bounds of the games of the
+# worker process, shared across all its games
+_worker_engine = None
+_worker_cache = None
+_worker_instruments = None
+_worker_rules = None
+_worker_bounds = {}
+
+
+def _init_worker(engine_class, cache_size, instrumented=False, rules=None,
+        max_turns=None, stalemate_rounds=None):
+    global _worker_engine, _worker_cache, _worker_instruments, _worker_rules,\
+            _worker_bounds
+    # the chips must be in use before the engine builds its tables
+    if rules is not None:
+        use(rules)
+    _worker_rules = rules
+    _worker_bounds = {"max_turns": max_turns,
+            "stalemate_rounds": stalemate_rounds}
+    _worker_engine = None if engine_class is None else engine_class()
+    _worker_cache = None if cache_size is None else DecisionCache(cache_size)
+    _worker_instruments = Instruments() if instrumented else None
+
+
+def _play(args):
+    """Returns the result of the game and the snapshot of its instruments
+    (None if not instrumented)."""
+    seed, nr_players = args
+    instruments = _worker_instruments
+    if instruments is None:
+        return play_game(seed, nr_players, _worker_engine, _worker_cache,
+                rules=_worker_rules, **_worker_bounds), None
+    instruments.reset()
+    result = play_game(seed, nr_players, _worker_engine, _worker_cache,
+            instruments, _worker_rules, **_worker_bounds)
+    return result, instruments.snapshot()
+
+
+def simulate(nr_games, nr_players=4, seed=0, processes=None,
+        engine_class=None, chunksize=64, cache_size=None,
+        instrumented=False, rules=None, max_turns=None,
+        stalemate_rounds=None):
+    """Play `nr_games` games with seeds `seed`, `seed + 1`, ... and return the
+    aggregated `Statistics`. The games are distributed among `processes`
+    worker processes (by default, one per CPU core). With `processes=1`, all
+    games are played in the current process. Every worker instantiates
+    `engine_class` (if given) once and uses it for all of its games. If
+    `cache_size` is given, every worker shares a `DecisionCache` of that size
+    among its games. If `instrumented`, the games are timed and counted (see
+    `pyrummy.instruments`) and the totals are aggregated in
+    `Statistics.instruments`. If a `pyrummy.rules.RuleSet` is given as
+    `rules`, every game is played with it and `nr_players` is ignored; the
+    workers put its chips to use (see `pyrummy.rules.use`), with
+    `processes=1` the current process does.
+    `max_turns` and `stalemate_rounds` bound every game (see `Game`); the
+    games ending without winner are counted in `Statistics.outcomes`."""
+    if rules is not None:
+        nr_players = rules.players
+    statistics = Statistics(nr_players)
+    if instrumented:
+        statistics.instruments = Instruments()
+    tasks = ((s, nr_players) for s in range(seed, seed + nr_games))
+    initargs = (engine_class, cache_size, instrumented, rules, max_turns,
+            stalemate_rounds)
+
+    def add(result, snapshot):
+        statistics.add(result)
+        if snapshot is not None:
+            statistics.instruments.merge(snapshot)
+
+    if processes == 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            add(*_play(task))
+        return statistics
+
+    with multiprocessing.Pool(processes, _init_worker, initargs) as pool:
+        for result, snapshot in pool.imap_unordered(_play, tasks, chunksize):
+            add(result, snapshot)
+    return statistics
+
+
+ENGINES = {
+        "greedy": GreedyEngine,
+        "bitset": BitsetEngine,
+        "optimal": OptimalEngine,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate rummy games.")
+    parser.add_argument("games", type=int, help="number of games")
+    parser.add_argument("-n", "--players", type=int, default=4)
+    parser.add_argument("-s", "--seed", type=int, default=0,
+            help="seed of the first game")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+            help="number of worker processes (default: number of cores)")
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES),
+            default="greedy")
+    parser.add_argument("-c", "--cache-size", type=int, default=None,
+            help="size of the decision cache per worker (default: no cache)")
+    parser.add_argument("-i", "--instrument", action="store_true",
+            help="report time and counts per phase of the games")
+    parser.add_argument("-m", "--max-turns", type=int, default=None,
+            help="end games without winner after this many turns")
+    parser.add_argument("--stalemate-rounds", type=int, default=None,
+            help="end games without winner after this many rounds in which "
+            "no hand changed")
+    rules = parser.add_argument_group("rules")
+    rules.add_argument("--decks", type=int, default=STANDARD.decks)
+    rules.add_argument("--colors", type=int, default=STANDARD.colors)
+    rules.add_argument("--max-value", type=int, default=STANDARD.max_value)
+    rules.add_argument("--hand-size", type=int, default=STANDARD.hand_size)
+    rules.add_argument("--threshold", type=int, default=STANDARD.threshold)
+    args = parser.parse_args()
+
+    rules = RuleSet(args.decks, args.colors, STANDARD.min_value,
+            args.max_value, args.hand_size, args.threshold, args.players)
+    statistics = simulate(args.games, args.players, args.seed, args.processes,
+            ENGINES[args.engine], cache_size=args.cache_size,
+            instrumented=args.instrument, rules=rules,
+            max_turns=args.max_turns, stalemate_rounds=args.stalemate_rounds)
+    for key, value in statistics.as_dict().items():
+        print("{}: {}".format(key, value))
@@ -0,0 +1,127 @@
+"""Bitset encoding of hands for a fast combination search.
+A hand is packed into an integer with bit `chip.id` set for every chip on the
+hand. Since chip ids are ordered by value, the highest set bit always refers to
+the highest chip. Matching melds of the catalog (see `pyrummy.melds`),
+removing chips and computing the rest of a constellation are thus reduced to
+bitwise operations."""
+
+from pyrummy.chips import Chip, combination
+from pyrummy.hand import Hand
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global NR_CODES, NR_CHIPS, _VALUES, _CANDIDATES, BY_TOP
+    from pyrummy.melds import BY_TOP
+    NR_CODES = (Chip.MAX_VALUE - Chip.MIN_VALUE + 1) * Chip.NR_COLORS
+    NR_CHIPS = NR_CODES * Chip.NR_DECKS
+    # value and mask of candidates per chip id
+    _VALUES = [Chip.from_id(chip_id).value for chip_id in range(NR_CHIPS)]
+    _CANDIDATES = [sum(1 << i for i in Chip.from_id(chip_id).candidate_ids())
+            for chip_id in range(NR_CHIPS)]
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def iter_ids(mask):
+    """Yield the ids of all set bits in `mask`, highest first."""
+    while mask:
+        chip_id = mask.bit_length() - 1
+        mask ^= 1 << chip_id
+        yield chip_id
+
+
+class BitsetConstellation(object):
+    """Constellation of a hand encoded as bitset. `melds` holds tuples of the
+    chip ids of the combinations, `mask` the union of all their bits. The
+    `Run`s and `Book`s as well as the rest are only created on demand. Like
+    `pyrummy.game._Constellation`, constellations are hashed and compared by
+    `mask`."""
+
+    def __init__(self, chips, hand_mask, melds, mask):
+        self._chips = chips
+        self._hand_mask = hand_mask
+        self.melds = melds
+        self.mask = mask
+        self.value = sum(_VALUES[i] for meld in melds for i in meld)
+        self.size = popcount(mask)
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __eq__(self, other):
+        return isinstance(other, BitsetConstellation) and \
+                self.mask == other.mask
+
+    @property
+    def combinations(self):
+        return [combination(*[self._chips[i] for i in meld]) for meld in
+                self.melds]
+
+    @property
+    def rest(self):
+        return [self._chips[i] for i in
+                iter_ids(self._hand_mask & ~self.mask)]
+
+    def combination_chips(self):
+        for meld in self.melds:
+            for chip_id in meld:
+                yield self._chips[chip_id]
+
+
+class BitsetEngine(object):
+    """Search strategy equivalent to the `GreedyEngine`, operating on the
+    bitset encoding of the hand. Constellations with identical combination
+    chips are only reported once."""
+
+    def constellations(self, hand):
+        if isinstance(hand, Hand):
+            # maintained incrementally by the player's hand; the constellations
+            # must not be affected by modifications of the hand
+            chips, hand_mask = dict(hand.chips), hand.mask
+        else:
+            chips = {}
+            hand_mask = 0
+            for chip in hand:
+                chips[chip.id] = chip
+                hand_mask |= 1 << chip.id
+
+        constellations = {}
+        for start in iter_ids(hand_mask):
+            # all chips not higher than the start chip
+            subpool = hand_mask & ((2 << start) - 1)
+            melds = []
+            mask = 0
+
+            while subpool:
+                highest = subpool.bit_length() - 1
+                if not subpool & _CANDIDATES[highest]:
+                    subpool ^= 1 << highest
+                    continue
+                for meld in BY_TOP[highest // Chip.NR_DECKS]:
+                    ids = []
+                    # from the top, where missing chips are detected first
+                    for code_mask in reversed(meld.masks):
+                        # the highest chip of the code; for the code of
+                        # `highest`, that is `highest` itself
+                        code_chips = subpool & code_mask
+                        if not code_chips:
+                            break
+                        ids.append(code_chips.bit_length() - 1)
+                    else:
+                        melds.append(tuple(ids))
+                        for chip_id in ids:
+                            subpool ^= 1 << chip_id
+                            mask |= 1 << chip_id
+                        break
+                else:
+                    subpool ^= 1 << highest
+
+            if mask not in constellations:
+                constellations[mask] = BitsetConstellation(chips, hand_mask,
+                        melds, mask)
+
+        return list(constellations.values())
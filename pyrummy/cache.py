@@ -0,0 +1,59 @@
+"""Cache of playing decisions shared across players and games.
+The combinations `Player.play` publishes only depend on the codes of the hand
+chips (not on the chip indices), the player's status and the publishing
+threshold. In bulk simulations, the same positions occur over and over again;
+with a `DecisionCache` the search is performed only once per position. The
+chip to drop also depends on the player's knowledge of the unseen chips and
+is hence selected anew on every turn, among the cached drop candidates."""
+
+from collections import namedtuple, OrderedDict
+
+
+Decision = namedtuple("Decision", "combinations rest")
+Decision.__doc__ = """`combinations` holds one tuple of code indices per
+published combination, `rest` the code indices of the chips the chip to drop
+is selected from."""
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+def position_key(hand, status, threshold):
+    """Canonical key of a position: the number of chips per code of the `Hand`,
+    the player status and the threshold."""
+    return (tuple(hand.counts), status, threshold)
+
+
+class DecisionCache(object):
+    """Maps position keys to `Decision`s. If more than `maxsize` decisions are
+    stored, the least recently used ones are discarded. A cache must only be
+    shared among players using the same engine and drop selector."""
+
+    def __init__(self, maxsize=2**16):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._decisions = OrderedDict()
+
+    def get(self, key):
+        """Returns the decision stored for `key`, or None."""
+        decision = self._decisions.get(key)
+        if decision is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._decisions.move_to_end(key)
+        return decision
+
+    def put(self, key, decision):
+        self._decisions[key] = decision
+        self._decisions.move_to_end(key)
+        if len(self._decisions) > self.maxsize:
+            self._decisions.popitem(last=False)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                len(self._decisions))
+
+    def clear(self):
+        self.hits = self.misses = 0
+        self._decisions.clear()
@@ -1,36 +1,76 @@
-from abc import ABCMeta, abstractmethod
-from collections import deque
 from operator import attrgetter
+import warnings
+
+from pyrummy.rules import STANDARD, on_use
 
 
 class Chip(object):
     """A chip is identified by its color (one of yellow, red, blue, black), its
     value (ranging from 1 to 13) and its index (integer starting from 0,
-    required to distinguish chips of the same code)."""
+    required to distinguish chips of the same code). Rule variants with other
+    numbers of decks and colors or another value range are put to use by
+    `pyrummy.rules.use`; colors beyond black have no name but a code.
+    Chips are flyweights: there is exactly one instance per color, value and
+    index, which is returned whenever such a chip is created. Hence chips are
+    compared by identity and hashed by their precomputed id. Since the
+    instance is shared by all games of the process, a chip has no location;
+    the `location` argument and attribute are deprecated."""
+
+    __slots__ = ("_color", "_value", "_index", "_id", "_code_index")
 
     # color enum
     YELLOW = 0
     RED = 1
     BLUE = 2
     BLACK = 3
-    NR_COLORS = 4
-    COLOR_CODES = "yrbk"
-
-    MIN_VALUE = 1
-    MAX_VALUE = 13
+    NR_COLORS = STANDARD.colors
+    COLOR_CODES = "yrbkgpocwm"
+
+    MIN_VALUE = STANDARD.min_value
+    MAX_VALUE = STANDARD.max_value
+
+    # number of decks, i.e. number of chips sharing the same code
+    NR_DECKS = STANDARD.decks
+
+    # location enum (deprecated, see `location`); non-negative values
+    # indicate the hand of the player of that index
+    POOL = -1
+    YARDS = -2
+
+    # interned instances by (color, value, index)
+    _instances = {}
+
+    def __new__(cls, color, value, location=None, index=0):
+        key = (color, value, index)
+        chip = cls._instances.get(key)
+        if chip is None:
+            chip = super().__new__(cls)
+            chip._color = color
+            chip._value = value
+            chip._index = index
+            chip._code_index = (value - Chip.MIN_VALUE) * Chip.NR_COLORS +\
+                    color
+            chip._id = chip._code_index * Chip.NR_DECKS + index
+            cls._instances[key] = chip
+        return chip
+
+    def __init__(self, color, value, location=None, index=0):
+        """`location` is deprecated and ignored."""
+        if location is not None:
+            _warn_location()
+
+    def __reduce__(self):
+        return (Chip, (self._color, self._value, None, self._index))
 
-    # location enum; 0-5 indicate player hand
-    POOL = 6
-    YARDS = 7
-
-    def __init__(self, color, value, location=POOL, index=0):
-        self._color = color
-        self._value = value
-        self._location = location
-        self._index = index
+    @classmethod
+    def from_id(cls, chip_id):
+        """Returns the chip of the given id (see `Chip.id`)."""
+        code_index, index = divmod(chip_id, cls.NR_DECKS)
+        value, color = divmod(code_index, cls.NR_COLORS)
+        return cls(color, value + cls.MIN_VALUE, index=index)
 
     @classmethod
-    def from_str(cls, code, location=POOL, index=0):
+    def from_str(cls, code, location=None, index=0):
         """Convenience method for quickly generating a Chip from a string code,
         f.i. 'y9', 'Y9', 'y09' or 'Y09' for a yellow nine."""
         color = cls.COLOR_CODES.find(code[0].lower())
@@ -50,7 +90,22 @@ class Chip(object):
         8. The chip index does not matter. This function is useful if the chip
         as a unique object is not required, i.e. when comparing a chip to
         another chip's candidates."""
-        return "{}{:02}".format(self.COLOR_CODES[self._color], self._value)
+        return _CODES[self.code_index]
+
+    @property
+    def id(self):
+        """Returns an integer uniquely identifying the physical chip within the
+        pool (ranging from 0 to 103 with the standard rules). Ids are ordered
+        by value, then by color and finally by index, i.e. a chip with a
+        higher id never has a lower value."""
+        return self._id
+
+    @property
+    def code_index(self):
+        """Returns an integer identifying color and value of the chip (ranging
+        from 0 to 51 with the standard rules), ordered by value, then by
+        color. Like `code`, the chip index does not matter."""
+        return self._code_index
 
     @property
     def value(self):
@@ -62,37 +117,35 @@ class Chip(object):
 
     @property
     def location(self):
-        return self._location
+        """Deprecated: a chip is shared by all games, hence it has no
+        location. Always None; the hands, yards and pool of a game tell where
+        its chips are."""
+        _warn_location()
+        return None
 
     @location.setter
     def location(self, value):
-        self._location = value
+        _warn_location()
 
     def __hash__(self):
-        """Generate a unique bit flag for the chip. First bit indicates the
-        index, next three bits the location, next two bits the color and the
-        final 5 bits the value: ILLLCCVVVVV"""
-        return self._value + (self._color << 5) + (self._location << 7) +\
-                (self._index << 10)
-
-    def __eq__(self, other):
-        """Check if two chip instances are physically identical."""
-        return self._color == other._color and self._value == other._value and\
-                self._index == other._index
+        return self._id
 
     def candidates(self):
-        all_colors = set(range(Chip.NR_COLORS))
-        for color in all_colors.difference({self._color}):
-            yield Chip(color, self._value).code
-        if self._value < Chip.MAX_VALUE:
-            yield Chip(self._color, self._value + 1).code
-        if self._value > Chip.MIN_VALUE:
-            yield Chip(self._color, self._value - 1).code
+        """Returns the codes of chips that can form a combination with this
+        chip: chips of equal value and different color, and chips of equal
+        color and adjacent value."""
+        return _CANDIDATE_CODES[self.code_index]
+
+    def candidate_ids(self):
+        """Returns the ids of all chips (of any index) whose code is among the
+        candidates."""
+        return _CANDIDATE_IDS[self.code_index]
 
     def __repr__(self):
         """Similar to `Chip.code()` but also shows the chip index. For
         debugging purposes."""
-        return "{}{:02} {}".format("yrbk"[self._color], self._value, self._index)
+        return "{}{:02} {}".format(Chip.COLOR_CODES[self._color], self._value,
+                self._index)
 
     @staticmethod
     def remote_candidates(first, second):
@@ -109,41 +162,204 @@ class Chip(object):
         return False
 
 
-class Combination(object):
+def _warn_location():
+    warnings.warn("Chips are shared by all games and have no location.",
+            DeprecationWarning, stacklevel=3)
+
 
-    __metaclass__ = ABCMeta
+class Combination(object):
+    """Immutable meld of chips. The chips are held in a tuple; the value, the
+    bitset of chip ids (`mask`) and the candidates accepted to extend the
+    combination are computed on creation. Combinations are hashed and
+    compared by their chips. `extended` returns a new combination."""
+
+    __slots__ = ("_chips", "_value", "_mask", "_candidates")
+
+    def _init(self, chips, candidates):
+        self._chips = chips
+        value = mask = 0
+        for chip in chips:
+            value += chip.value
+            mask |= 1 << chip.id
+        self._value = value
+        self._mask = mask
+        self._candidates = candidates
+
+    def _extend(self, chips, chip, candidates):
+        """Returns a new combination of the same type holding `chips`, i.e.
+        the chips of this combination and `chip`."""
+        extended = object.__new__(type(self))
+        extended._chips = chips
+        extended._value = self._value + chip.value
+        extended._mask = self._mask | 1 << chip.id
+        extended._candidates = candidates
+        return extended
 
     @property
     def value(self):
-        return sum([chip.value for chip in self])
+        return self._value
+
+    @property
+    def mask(self):
+        return self._mask
 
-    @abstractmethod
     def candidates(self):
-        pass
+        """Returns the codes of chips that extend the combination."""
+        return self._candidates[0]
 
+    def candidate_ids(self):
+        """Returns the ids of chips that extend the combination."""
+        return self._candidates[1]
 
-class Book(set, Combination):
+    def accepts(self, chip):
+        return chip.id in self._candidates[1]
 
-    def __init__(self, *args):
-        super().__init__(args)
-        self._chip_value = args[0].value
+    def __iter__(self):
+        return iter(self._chips)
 
-    def candidates(self):
-        all_colors = set(range(Chip.NR_COLORS))
-        self_colors = set([chip.color for chip in self])
-        for color in all_colors.difference(self_colors):
-            yield Chip(color, self._chip_value).code
+    def __len__(self):
+        return len(self._chips)
 
+    def __getitem__(self, index):
+        return self._chips[index]
 
-class Run(deque, Combination):
+    def __contains__(self, chip):
+        return chip in self._chips
 
-    def __init__(self, *args):
-        super().__init__(sorted(list(args), key=attrgetter("value")))
-        self._chip_color = args[0].color
+    def __hash__(self):
+        return hash(self._mask)
 
-    def candidates(self):
-        if self[-1].value < Chip.MAX_VALUE:
-            yield Chip(self._chip_color, self[-1].value + 1).code
-        if self[0].value > Chip.MIN_VALUE:
-            yield Chip(self._chip_color, self[0].value - 1).code
+    def __eq__(self, other):
+        return type(self) is type(other) and self._mask == other._mask
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, list(self._chips))
+
+
+class Book(Combination):
+    """Chips of equal value and different colors."""
+
+    __slots__ = ()
+
+    def __init__(self, *chips):
+        colors = 0
+        for chip in chips:
+            colors |= 1 << chip.color
+        self._init(chips, _BOOK_CANDIDATES[chips[0].value, colors])
+
+    @property
+    def colors(self):
+        """Bitmask of the colors present."""
+        colors = 0
+        for chip in self._chips:
+            colors |= 1 << chip.color
+        return colors
+
+    def extended(self, chip):
+        """Returns the book with `chip` added."""
+        return self._extend(self._chips + (chip,), chip, _BOOK_CANDIDATES[
+            chip.value, self.colors | 1 << chip.color])
+
+
+class Run(Combination):
+    """Chips of equal color and consecutive values, in ascending order."""
+
+    __slots__ = ()
+
+    def __init__(self, *chips):
+        chips = tuple(sorted(chips, key=attrgetter("value")))
+        self._init(chips, _RUN_CANDIDATES[chips[0].color, chips[0].value,
+            chips[-1].value])
+
+    @property
+    def color(self):
+        return self._chips[0].color
+
+    @property
+    def low(self):
+        return self._chips[0].value
+
+    @property
+    def high(self):
+        return self._chips[-1].value
+
+    def extended(self, chip):
+        """Returns the run with `chip` added at either end."""
+        if chip.value < self._chips[0].value:
+            chips = (chip,) + self._chips
+        else:
+            chips = self._chips + (chip,)
+        return self._extend(chips, chip, _RUN_CANDIDATES[chip.color,
+            chips[0].value, chips[-1].value])
+
+
+def combination(*chips):
+    """Returns a Book of the given chips if they share the same value, a Run
+    otherwise."""
+    if chips[0].value == chips[1].value:
+        return Book(*chips)
+    return Run(*chips)
+
+
+def _build_candidate_tables():
+    """Precompute the codes and candidates of every chip, and the candidates of
+    every possible Book (by value and colors present) and Run (by color and
+    value range). Chip tables are indexed by code index."""
+    values = range(Chip.MIN_VALUE, Chip.MAX_VALUE + 1)
+    colors = range(Chip.NR_COLORS)
+    nr_codes = len(values) * Chip.NR_COLORS
+
+    def code(color, value):
+        return "{}{:02}".format(Chip.COLOR_CODES[color], value)
+
+    def ids(color, value):
+        first = Chip(color, value).id
+        return range(first, first + Chip.NR_DECKS)
+
+    def entry(pairs):
+        return (tuple(code(c, v) for c, v in pairs),
+                frozenset(i for c, v in pairs for i in ids(c, v)))
+
+    codes = nr_codes * [None]
+    candidate_codes = nr_codes * [None]
+    candidate_ids = nr_codes * [None]
+    book_candidates = {}
+    run_candidates = {}
+
+    for value in values:
+        for color in colors:
+            pairs = [(c, value) for c in colors if c != color]
+            if value < Chip.MAX_VALUE:
+                pairs.append((color, value + 1))
+            if value > Chip.MIN_VALUE:
+                pairs.append((color, value - 1))
+            code_index = Chip(color, value).code_index
+            codes[code_index] = code(color, value)
+            candidate_codes[code_index], candidate_ids[code_index] = \
+                    entry(pairs)
+
+        for mask in range(1 << Chip.NR_COLORS):
+            book_candidates[value, mask] = entry(
+                    [(c, value) for c in colors if not mask & (1 << c)])
+
+    for color in colors:
+        for low in values:
+            for high in range(low, Chip.MAX_VALUE + 1):
+                pairs = []
+                if high < Chip.MAX_VALUE:
+                    pairs.append((color, high + 1))
+                if low > Chip.MIN_VALUE:
+                    pairs.append((color, low - 1))
+                run_candidates[color, low, high] = entry(pairs)
+
+    return codes, candidate_codes, candidate_ids, book_candidates,\
+            run_candidates
+
+
+@on_use
+def _configure():
+    global _CODES, _CANDIDATE_CODES, _CANDIDATE_IDS, _BOOK_CANDIDATES,\
+            _RUN_CANDIDATES
+    _CODES, _CANDIDATE_CODES, _CANDIDATE_IDS, _BOOK_CANDIDATES,\
+            _RUN_CANDIDATES = _build_candidate_tables()
 
@@ -0,0 +1,294 @@
+"""Export of self-play games as NumPy arrays (requires NumPy).
+A `DatasetWriter` is a trace (see `pyrummy.events`) that records every
+decision point of the games it is passed, i.e. every turn after the draw.
+Every column of the dataset is stored in a `.npy` file of the output
+directory, holding one row per decision point:
+    game: index of the game in the dataset
+    turn, player: turn number and index of the deciding player
+    hand: chips on the hand of the player, as count matrix of shape
+          (Chip.NR_COLORS, values) like `pyrummy.vectorized.encode`
+    yards: chips on the yards of all players, as count matrix
+    pool: number of chips in the pool
+    status: status of the player (see `Player.HAND_ONLY`)
+    melds: chips the player published in the turn, as count matrix
+    lay_offs: chips the player laid off in the turn, as count matrix
+    drop: code index of the dropped chip, or -1
+and the columns `game_seed` (-1 if None), `game_winner` (-1 if there is
+none), `game_turns` and `game_outcome` (index in `Game.OUTCOMES`, -1 if the
+game did not end) hold one row per game.
+Rows are collected in preallocated chunks which are appended to the files
+when full, hence memory usage does not depend on the number of games. The
+files are valid `.npy` files once the writer is closed; `load` memory-maps
+them, s.t. slicing does not copy."""
+
+import argparse
+import os
+
+import numpy as np
+
+from pyrummy import events
+from pyrummy.batch import ENGINES
+from pyrummy.chips import Chip
+from pyrummy.game import Game, Player
+from pyrummy.rules import use
+
+
+# size of the .npy header, reserved when a column is created and rewritten
+# with the final number of rows when it is closed
+HEADER_SIZE = 128
+
+
+def _header(dtype, shape):
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}"\
+            .format(np.lib.format.dtype_to_descr(dtype), shape)
+    # magic, version 1.0 and length of the header, which is padded with
+    # spaces and terminated by a newline
+    header = header.ljust(HEADER_SIZE - 10 - 1) + "\n"
+    return b"\x93NUMPY\x01\x00" + (len(header)).to_bytes(2, "little") +\
+            header.encode("latin1")
+
+
+class _Column(object):
+    """Column of `dtype` with rows of `shape`, buffered in a chunk of
+    `chunk_size` rows and written to the .npy file at `path`."""
+
+    def __init__(self, path, dtype, shape, chunk_size):
+        self.dtype = np.dtype(dtype)
+        self.shape = shape
+        self.buffer = np.zeros((chunk_size,) + shape, self.dtype)
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(_header(self.dtype, (0,) + shape))
+
+    def flush(self, rows):
+        """Append the first `rows` rows of the buffer to the file."""
+        # a leading slice of the buffer is contiguous, hence written without
+        # copying
+        self._file.write(self.buffer[:rows].data)
+        self.rows += rows
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(_header(self.dtype, (self.rows,) + self.shape))
+        self._file.close()
+
+
+class DatasetWriter(object):
+    """Trace writing the decision points of games to the directory at `path`
+    (see the module documentation). `chunk_size` rows are buffered per
+    column. The pool size is derived from the chips of the active rules,
+    i.e. games have to be played with the full pool. Use as context manager
+    or call `close()` when finished."""
+
+    def __init__(self, path, chunk_size=65536):
+        os.makedirs(path, exist_ok=True)
+        self._chunk_size = chunk_size
+        matrix = (Chip.NR_COLORS, Chip.MAX_VALUE - Chip.MIN_VALUE + 1)
+        self._nr_chips = Chip.NR_DECKS * matrix[0] * matrix[1]
+
+        def column(name, dtype, shape=(), chunk_size=chunk_size):
+            return _Column(os.path.join(path, name + ".npy"), dtype, shape,
+                    chunk_size)
+
+        self._columns = (
+                column("game", np.uint32),
+                column("turn", np.uint32),
+                column("player", np.uint16),
+                column("hand", np.uint8, matrix),
+                column("yards", np.uint8, matrix),
+                column("pool", np.uint32),
+                column("status", np.uint8),
+                column("melds", np.uint8, matrix),
+                column("lay_offs", np.uint8, matrix),
+                column("drop", np.int16),
+                )
+        (self._game, self._turn, self._player, self._hand, self._yards,
+                self._pool, self._status, self._melds, self._lay_offs,
+                self._drop) = (c.buffer for c in self._columns)
+        # games are few compared to decision points
+        game_chunk_size = max(1, chunk_size // 64)
+        self._game_columns = (
+                column("game_seed", np.int64, chunk_size=game_chunk_size),
+                column("game_winner", np.int16, chunk_size=game_chunk_size),
+                column("game_turns", np.uint32, chunk_size=game_chunk_size),
+                column("game_outcome", np.int8, chunk_size=game_chunk_size),
+                )
+        self._game_seed, self._game_winner, self._game_turns,\
+                self._game_outcome = (c.buffer for c in self._game_columns)
+
+        # number of rows in the current chunks and index of the current game
+        self._rows = 0
+        self._games = 0
+        self._game_index = -1
+        # state of the current game
+        self._hands = None
+        self._last_turn = 0
+        self._yard_counts = np.zeros(matrix, np.uint8)
+        self._published = None
+        self._pool_size = 0
+
+    def __call__(self, event):
+        handler = self._handlers.get(type(event))
+        if handler is not None:
+            handler(self, event)
+
+    @staticmethod
+    def _cell(chip_id):
+        chip = Chip.from_id(chip_id)
+        return chip.color, chip.value - Chip.MIN_VALUE
+
+    def _start(self, event):
+        self._end_game()
+        self._game_index += 1
+        self._last_turn = 0
+        row = self._games
+        self._game_seed[row] = -1 if event.seed is None else event.seed
+        self._game_winner[row] = -1
+        self._game_outcome[row] = -1
+        self._hands = np.zeros((len(event.hands),) + self._yard_counts.shape,
+                np.uint8)
+        for hand, ids in zip(self._hands, event.hands):
+            for chip_id in ids:
+                hand[self._cell(chip_id)] += 1
+        self._yard_counts[...] = 0
+        self._published = len(event.hands) * [False]
+        self._pool_size = self._nr_chips - sum(len(ids) for ids in
+                event.hands)
+
+    def _draw(self, event):
+        player = event.player
+        cell = self._cell(event.chip)
+        self._hands[player][cell] += 1
+        self._pool_size -= 1
+        self._last_turn = event.turn
+
+        row = self._rows
+        self._game[row] = self._game_index
+        self._turn[row] = event.turn
+        self._player[row] = player
+        self._hand[row] = self._hands[player]
+        self._yards[row] = self._yard_counts
+        self._pool[row] = self._pool_size
+        self._status[row] = Player.PUBLISHED if self._published[player] else\
+                Player.HAND_ONLY
+        self._melds[row] = 0
+        self._lay_offs[row] = 0
+        self._drop[row] = -1
+
+    def _publish(self, event):
+        hand = self._hands[event.player]
+        melds = self._melds[self._rows]
+        for combination in event.combinations:
+            for chip_id in combination:
+                cell = self._cell(chip_id)
+                hand[cell] -= 1
+                self._yard_counts[cell] += 1
+                melds[cell] += 1
+        self._published[event.player] = True
+
+    def _lay_off(self, event):
+        cell = self._cell(event.chip)
+        self._hands[event.player][cell] -= 1
+        self._yard_counts[cell] += 1
+        self._lay_offs[self._rows][cell] += 1
+
+    def _drop_chip(self, event):
+        if event.chip is not None:
+            self._hands[event.player][self._cell(event.chip)] -= 1
+            self._pool_size += 1
+            self._drop[self._rows] = Chip.from_id(event.chip).code_index
+        self._rows += 1
+        if self._rows == self._chunk_size:
+            self._flush()
+
+    def _win(self, event):
+        self._game_winner[self._games] = event.player
+        self._game_turns[self._games] = event.turn
+        self._game_outcome[self._games] = Game.OUTCOMES.index(Game.WON)
+
+    def _end(self, event):
+        self._game_turns[self._games] = event.turn
+        self._game_outcome[self._games] = Game.OUTCOMES.index(event.outcome)
+
+    _handlers = {
+            events.GameStart: _start,
+            events.Draw: _draw,
+            events.Publish: _publish,
+            events.LayOff: _lay_off,
+            events.Drop: _drop_chip,
+            events.Win: _win,
+            events.End: _end,
+            }
+
+    def _end_game(self):
+        """Complete the row of the current game, if any."""
+        if self._hands is None:
+            return
+        if self._game_outcome[self._games] < 0:
+            self._game_turns[self._games] = self._last_turn
+        self._hands = None
+        self._games += 1
+        if self._games == len(self._game_seed):
+            for column in self._game_columns:
+                column.flush(self._games)
+            self._games = 0
+
+    def _flush(self):
+        for column in self._columns:
+            column.flush(self._rows)
+        self._rows = 0
+
+    def close(self):
+        self._end_game()
+        self._flush()
+        for column in self._game_columns:
+            column.flush(self._games)
+        for column in self._columns + self._game_columns:
+            column.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def load(path):
+    """Returns a dict of the columns of the dataset at `path`, memory-mapped
+    read-only."""
+    return {name[:-len(".npy")]: np.load(os.path.join(path, name),
+        mmap_mode="r") for name in sorted(os.listdir(path)) if
+        name.endswith(".npy")}
+
+
+def export(path, nr_games, nr_players=4, seed=0, engine=None, rules=None,
+        chunk_size=65536):
+    """Play `nr_games` games with seeds `seed`, `seed + 1`, ... and write
+    their decision points to the directory at `path`."""
+    if rules is not None:
+        # the shape of the count matrices depends on the chips
+        use(rules)
+    with DatasetWriter(path, chunk_size) as writer:
+        for s in range(seed, seed + nr_games):
+            Game(nr_players, seed=s, engine=engine, trace=writer,
+                    rules=rules).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+            description="Export the decision points of self-play games.")
+    parser.add_argument("path", help="output directory")
+    parser.add_argument("games", type=int, help="number of games")
+    parser.add_argument("-n", "--players", type=int, default=4)
+    parser.add_argument("-s", "--seed", type=int, default=0,
+            help="seed of the first game")
+    parser.add_argument("-e", "--engine", choices=sorted(ENGINES),
+            default="greedy")
+    parser.add_argument("-c", "--chunk-size", type=int, default=65536,
+            help="number of rows buffered per column")
+    args = parser.parse_args()
+
+    export(args.path, args.games, args.players, args.seed,
+            ENGINES[args.engine](), chunk_size=args.chunk_size)
+    for name, column in load(args.path).items():
+        print("{}: {} {}".format(name, column.dtype, column.shape))
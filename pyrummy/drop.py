@@ -0,0 +1,83 @@
+"""Selection of the chip to drop at the end of a turn."""
+
+from operator import itemgetter
+
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global REMOTE_CODE_INDICES
+    from pyrummy.hand import REMOTE_CODE_INDICES
+
+
+def default_score(chip, degree, matched):
+    """Chips without a remote candidate partner are dropped first, preferably
+    those with the fewest remote candidates. If all chips have a partner, the
+    smallest one is dropped."""
+    if matched:
+        return (1, chip.value)
+    return (0, degree)
+
+
+class DropSelector(object):
+    """Selects the chip that is most unlikely to be combined in the future.
+    The chips are matched in pairs of remote candidates: in order of increasing
+    degree (i.e. number of remote candidates among the chips), every unmatched
+    chip is paired with its unmatched remote candidate of lowest degree.
+    Candidates are looked up in buckets by code (holding at most one chip per
+    deck), hence apart from sorting by degree the matching takes O(n) for n
+    chips.
+    Every chip is rated by `score(chip, degree, matched)`; one of the chips
+    with the lowest score is picked at random. If the number of outs per chip
+    (see `pyrummy.knowledge.Knowledge.outs`) is given, the pick is weighted by
+    1 / (1 + outs), s.t. chips that can hardly be combined anymore are more
+    likely dropped. Every chip of lowest score keeps a chance to be dropped,
+    hence a player cannot hold on to a chip forever."""
+
+    def __init__(self, score=default_score):
+        self._score = score
+
+    def match(self, chips, degrees):
+        """Returns the set of matched chips."""
+        buckets = {}
+        order = []
+        for chip, degree in zip(chips, degrees):
+            if degree:
+                buckets.setdefault(chip.code_index, []).append((degree, chip))
+                order.append((degree, chip))
+        order.sort(key=itemgetter(0))
+
+        matched = set()
+        for _, chip in order:
+            if chip in matched:
+                continue
+            partner = None
+            for code in REMOTE_CODE_INDICES[chip.code_index]:
+                # a bucket holds at most one chip per deck
+                for candidate in buckets.get(code, ()):
+                    if candidate[1] not in matched and (partner is None or
+                            candidate[0] < partner[0]):
+                        partner = candidate
+            if partner is not None:
+                matched.add(chip)
+                matched.add(partner[1])
+        return matched
+
+    def select(self, chips, degrees, rng, outs=None):
+        """Returns the chip to drop among `chips` with their `degrees` and
+        optionally their `outs`, or None if no chips are given. Ties are
+        broken using the random generator `rng`."""
+        if not chips:
+            return None
+        matched = self.match(chips, degrees)
+        scores = [self._score(chip, degree, chip in matched) for chip,
+                degree in zip(chips, degrees)]
+        lowest = min(scores)
+        if outs is None:
+            return rng.choice([chip for chip, score in zip(chips, scores) if
+                score == lowest])
+        candidates = [(chip, o) for chip, score, o in zip(chips, scores, outs)
+                if score == lowest]
+        return rng.choices([chip for chip, _ in candidates],
+                [1 / (1 + o) for _, o in candidates])[0]
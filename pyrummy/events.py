@@ -0,0 +1,67 @@
+"""Structured trace of a game.
+A game with a `trace` passes one event per action to it. Events are
+lightweight named tuples holding integers only: players by index and chips by
+id (apart from the outcome of an `End` event). The rule set of a `GameStart`
+event is a named tuple of integers as well. A trace is any callable
+accepting an event, f.i. a `MemorySink` or a `FileSink`."""
+
+from collections import namedtuple, deque
+import json
+
+
+GameStart = namedtuple("GameStart", "seed hands rules")
+Draw = namedtuple("Draw", "turn player chip")
+Publish = namedtuple("Publish", "turn player combinations")
+LayOff = namedtuple("LayOff", "turn player chip combination")
+Drop = namedtuple("Drop", "turn player chip")
+Win = namedtuple("Win", "turn player")
+End = namedtuple("End", "turn outcome")
+
+# `hands` and `combinations` are tuples of tuples of chip ids, `rules` is the
+# `pyrummy.rules.RuleSet` of the game. The `combination` of a LayOff event is
+# its position in the yards of the game (see `pyrummy.yards.Yards`). `chip` of
+# a Drop event is None if the player has no chip left to drop. A game ending
+# without winner emits an End event with the `outcome` of the game (see
+# `pyrummy.game.Game.outcome`).
+
+EVENT_TYPES = (GameStart, Draw, Publish, LayOff, Drop, Win, End)
+
+
+def as_dict(event):
+    """Returns a JSON-serializable dict of the event, with its type name
+    stored under the key "event"."""
+    result = {"event": type(event).__name__}
+    result.update(event._asdict())
+    return result
+
+
+class MemorySink(deque):
+    """Collects events in memory. If `maxlen` is given, only the most recent
+    events are kept."""
+
+    def __call__(self, event):
+        self.append(event)
+
+    def of_type(self, event_type):
+        return [e for e in self if isinstance(e, event_type)]
+
+
+class FileSink(object):
+    """Writes every event as a line of JSON to the file at `path`. Use as
+    context manager or call `close()` when finished."""
+
+    def __init__(self, path):
+        self._file = open(path, "w")
+
+    def __call__(self, event):
+        self._file.write(json.dumps(as_dict(event)))
+        self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,29 +1,56 @@
 from operator import attrgetter
-from itertools import combinations
 import random
 import logging
 import time
 
-from pyrummy.chips import Chip, Run, Book
+from pyrummy.chips import Chip, combination
+from pyrummy.hand import Hand
+from pyrummy.knowledge import Knowledge
+from pyrummy.drop import DropSelector
+from pyrummy.cache import Decision, position_key
+from pyrummy.state import Journal, Snapshot
+from pyrummy.yards import Yards
+from pyrummy.rules import STANDARD, active, chip_set, on_use, validate
+from pyrummy import events
 
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.DEBUG,
-        filename="log_{}".format(int(time.time())))
+
+
+@on_use
+def _configure():
+    global BY_TOP
+    from pyrummy.melds import BY_TOP
 
 
 class _Constellation(object):
-    """Container for chip combinations during the combination search.
-    `combinations` is a list of Books or Runs that can be formed from the given
-    chips. `rest` is a list of chips not contained in combinations."""
+    """Result of the combination search. `combinations` is a tuple of Books or
+    Runs that can be formed from the given chips, `rest` a list of the chips
+    not contained in combinations. Value and size (number of chips contained
+    in combinations) are computed once. Constellations are hashed and
+    compared by the set of their combination chips, hence equivalent
+    constellations collapse in sets and dicts."""
+
+    __slots__ = ("combinations", "rest", "value", "size", "mask", "_hash")
+
+    def __init__(self, combinations, rest):
+        self.combinations = tuple(combinations)
+        self.rest = rest
+        self.value = 0
+        mask = 0
+        for combi in self.combinations:
+            self.value += combi.value
+            mask |= combi.mask
+        # bitset of the chip ids contained in combinations
+        self.mask = mask
+        self.size = bin(mask).count("1")
+        self._hash = hash(mask)
 
-    def __init__(self):
-        self.combinations = []
-        self.rest = None
+    def __hash__(self):
+        return self._hash
 
-    @property
-    def value(self):
-        return sum([c.value for c in self.combinations])
+    def __eq__(self, other):
+        return isinstance(other, _Constellation) and self.mask == other.mask
 
     def combination_chips(self):
         for combi in self.combinations:
@@ -31,45 +58,125 @@ class _Constellation(object):
                 yield chip
 
 
+class GreedyEngine(object):
+    """Default search strategy operating on lists of chips. Starting from
+    every chip of the hand (in order of descending id, i.e. by value and then
+    color, like the `pyrummy.bitset.BitsetEngine`), combinations are
+    greedily collected: every chip is completed to the longest meld of the
+    catalog (see `pyrummy.melds`) in which it is the highest chip, if any.
+    Every start results in one constellation."""
+
+    def constellations(self, hand):
+        """Returns a list of `_Constellation`s that can be formed from the
+        chips in `hand`, without duplicates."""
+        # a dict keeps the order of constellations (and hence the game)
+        # reproducible
+        constellations = {}
+
+        # start with the highest chips; the order of the hand must not matter
+        pool = sorted(hand, key=attrgetter("id"), reverse=True)
+
+        for p in range(len(pool)):
+            subpool = pool[p:]
+            combinations = []
+            used = set()
+
+            # remaining chips by code index
+            available = {}
+            for chip in subpool:
+                available.setdefault(chip.code_index, []).append(chip)
+
+            for chip in subpool:
+                code = chip.code_index
+                if chip.id in used:
+                    continue
+                available[code].remove(chip)
+
+                for meld in BY_TOP[code]:
+                    # from the top, where missing chips are detected first
+                    if all(c == code or available.get(c) for c in
+                            reversed(meld.codes)):
+                        chips = [chip if c == code else available[c].pop(0)
+                                for c in meld.codes]
+                        used.update(c.id for c in chips)
+                        combinations.append(combination(*chips))
+                        break
+
+            # with status=PUBLISHED, other players' yards can be searched, too
+            constellation = _Constellation(combinations,
+                    [c for c in pool if c.id not in used])
+            constellations.setdefault(constellation)
+
+        return list(constellations)
+
+
 class Player(object):
     """Representing a Rummy player and his playing actions.
     Every player has an individual index (integer starting from 0). A player
-    administers chips on his hand and on his yard. He holds a status indicating
-    whether the player has published any chips from his hand to his yard."""
+    administers chips on his hand (indexed by a `Hand`) and on his yard. He
+    holds a status indicating whether the player has published any chips from
+    his hand to his yard.
+    The search for combinations is delegated to an `engine`, by default the
+    `GreedyEngine`. Alternatives are `pyrummy.bitset.BitsetEngine` (faster)
+    and `pyrummy.solver.OptimalEngine` (exact). The chip to drop is chosen by
+    a `pyrummy.drop.DropSelector`. Decisions are looked up in and stored to
+    the `pyrummy.cache.DecisionCache` `cache`, if given. A player without
+    game publishes at `threshold` (default: `Game.THRESHOLD`).
+    Once a player has published, he lays off chips he cannot combine on his
+    hand to the combinations of any yard in his following turns."""
 
     HAND_ONLY = 0
     JUST_PUBLISHED = 1
     PUBLISHED = 2
 
-    def __init__(self, index, hand, game=None):
+    def __init__(self, index, hand, game=None, engine=None,
+            drop_selector=None, cache=None, threshold=None):
         self._index = index
-        self._hand = []
+        self._hand = Hand()
+        self._knowledge = Knowledge()
         for chip in hand:
             self.draw(chip)
         self._game = game
+        self._random = random if game is None else game._random
+        self._engine = GreedyEngine() if engine is None else engine
+        self._drop_selector = DropSelector() if drop_selector is None else\
+                drop_selector
+        self._cache = cache
+        self._threshold = threshold
+        self._instruments = None if game is None else game._instruments
         self._status = Player.HAND_ONLY
+        self._publish_turn = None
         self._drop_chip = None
         self._yard = []
-        logger.debug("Player {} hand: {}".format(self._index, self._hand))
-        logger.debug("Player {} yard: {}".format(self._index, self._yard))
+        logger.debug("Player %d hand: %s", self._index, self._hand)
+
+    @property
+    def threshold(self):
+        """Minimum value of the combinations of the first publication."""
+        if self._game is not None:
+            return self._game.threshold
+        return Game.THRESHOLD if self._threshold is None else self._threshold
 
     def victorious(self):
         return len(self._hand) == 0
 
+    def hand_value(self):
+        return sum(chip.value for chip in self._hand)
+
     def draw(self, chip):
-        chip.location = self._index
         self._hand.append(chip)
-        logger.debug("Player {} draws: {}".format(self._index, chip))
+        self._knowledge.see(chip)
+        logger.debug("Player %d draws: %r", self._index, chip)
 
     def drop(self):
         """Remove the designated chip from the hand and return it, s.t. it can
         be added to the pool. Returns None if no chip is available."""
         chip = self._drop_chip
-        logger.debug("Player {} drops: {}".format(self._index, chip))
+        logger.debug("Player %d drops: %r", self._index, chip)
         if chip is None:
             return None
-        chip.location = Chip.POOL
         self._hand.remove(chip)
+        self._knowledge.hide(chip)
         self._drop_chip = None
         return chip
 
@@ -77,93 +184,160 @@ class Player(object):
         """Main routine. Searches for optimal constellation of hand chips,
         publishes combinations to the yard, if possible, and determines the
         chip to drop."""
-        constellations = set()
-
-        # start with the highest chips
-        pool = sorted(self._hand, key=attrgetter("value"))[::-1]
-
-        # TODO: with status==PUBLISHED, take pendants from yards into account.
+        instruments = self._instruments
+        if instruments is None:
+            self._play()
+        else:
+            start = time.perf_counter()
+            self._play()
+            instruments.time("play", start)
+
+    def _play(self):
+        # a player who published in an earlier turn may lay off chips to the
+        # yards; such decisions depend on the yards, hence are not cached
+        yards = None if self._game is None else self._game._yards
+        threshold = self.threshold
+        lay_off = self._status > Player.HAND_ONLY and bool(yards)
+        key = None
+        if self._cache is not None and not lay_off:
+            key = position_key(self._hand, self._status, threshold)
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._replay(decision)
+                return
 
-        for p in range(len(pool)):
-            # copy the pool, subpool will be modified
-            subpool = [c for c in pool[p:]]
-            constellation = _Constellation()
-
-            # at least 3 remaining cheps required for combination
-            while len(subpool) > 2:
-                # fetch and remove the first chip
-                highest_chip = subpool[0]
-                subpool.remove(highest_chip)
-
-                # create list of chip candidates once to not repeat in every iteration
-                candidates = list(highest_chip.candidates())
-
-                for chip in subpool:
-                    if chip.code in candidates:
-                        if chip.color == highest_chip.color:
-                            pair = Run(highest_chip, chip)
-                        else:
-                            pair = Book(highest_chip, chip)
-
-                        # try to find 3rd chip for full combination
-                        pair_candidates = list(pair.candidates())
-                        combination = None
-
-                        for cchip in subpool:
-                            if cchip.code in pair_candidates:
-                                combination = pair.__class__(
-                                        highest_chip, chip, cchip)
-                                subpool.remove(cchip)
-                                subpool.remove(chip)
-                                break
-
-                        # also break out of the outer for loop. If more than
-                        # one candidate for `chip` was available, it will be
-                        # found in another iteration of the outermost for-loop.
-                        if combination is not None:
-                            constellation.combinations.append(combination)
-                            break
-
-            # TODO: search rest for combinations longer than 3 chips
-            # with status=PUBLISHED, other players' yards can be searched, too
-            constellation.rest = [c for c in pool if c not in
-                    constellation.combination_chips()]
-            # TODO: hash constellation
-            constellations.add(constellation)
-
-        # find best (i.e. largest) constellation among existing ones
-        constellations = list(constellations)
-        constellations_sizes = [len(list(c.combination_chips())) for c in
-                constellations if c.value >= Game.THRESHOLD or
-                (self._status > Player.HAND_ONLY and c.value > 0)]
-        if constellations_sizes:
-            for best_constellation in constellations:
-                if len(list(best_constellation.combination_chips())) == \
-                        max(constellations_sizes):
-                    break
+        instruments = self._instruments
+        if instruments is None:
+            constellations = self._engine.constellations(self._hand)
+        else:
+            start = time.perf_counter()
+            constellations = self._engine.constellations(self._hand)
+            instruments.time("search", start)
+            instruments.observe("constellations", len(constellations))
+            instruments.observe("hand_chips", len(self._hand))
+        published = []
+
+        # find best (i.e. largest) publishable constellation and the one of
+        # highest value in a single pass; the first one wins ties
+        best_constellation = None
+        max_constellation = None
+        published_before = self._status > Player.HAND_ONLY
+        for c in constellations:
+            if c.value >= threshold or (published_before and c.value > 0):
+                if best_constellation is None or \
+                        c.size > best_constellation.size:
+                    best_constellation = c
+            if max_constellation is None or c.value > max_constellation.value:
+                max_constellation = c
+
+        if best_constellation is not None:
+            published = best_constellation.combinations
+            self._publish(published)
+            rest = best_constellation.rest
+        elif max_constellation.value > 2:
+            # constellations found, but unsufficient in value
+            rest = max_constellation.rest
+        else:
+            # no constellations found; in the order of the engines, s.t. the
+            # random choice of the chip to drop does not depend on the order
+            # of the hand (and cached decisions select the same chip)
+            rest = sorted(self._hand, key=attrgetter("id"), reverse=True)
 
-            # update player yard and hand
-            self._yard.extend(best_constellation.combinations)
+        if lay_off:
+            rest = self._lay_off(rest)
 
-            for c in best_constellation.combination_chips():
+        if instruments is None:
+            self._find_drop_chip(rest)
+        else:
+            start = time.perf_counter()
+            self._find_drop_chip(rest)
+            instruments.time("drop", start)
+            instruments.observe("drop_candidates", len(rest))
+
+        if key is not None:
+            self._cache.put(key, Decision(
+                tuple(tuple(chip.code_index for chip in combination) for
+                    combination in published),
+                tuple(chip.code_index for chip in rest)))
+
+    def _publish(self, combinations):
+        """Move the given combinations from the hand to the yard."""
+        if self._hand.journal is not None:
+            self._hand.journal.record(self._yard.__delitem__,
+                    slice(len(self._yard), None))
+        self._yard.extend(combinations)
+        if self._game is not None:
+            for combination in combinations:
+                self._game._yards.publish(self._index, combination)
+                self._game._reveal(self, combination)
+
+        for combination in combinations:
+            for c in combination:
                 self._hand.remove(c)
 
-            if self._status == Player.HAND_ONLY:
-                self._status = Player.PUBLISHED
-
-            logger.debug("Player {} publishes: {}".format(self._index,
-                best_constellation.combinations))
-            logger.debug("Player {} hand: {}".format(self._index, self._hand))
-            self._find_drop_chip(best_constellation.rest)
-        else:
-            # constellations found, but unsufficient in value; or none found
-            constellations_values = [c.value for c in constellations]
-            max_index = constellations_values.index(max(constellations_values))
-            max_constellation = constellations[max_index]
-            if max_constellation.value > 2:
-                self._find_drop_chip(max_constellation.rest)
-            else:
-                self._find_drop_chip(self._hand)
+        if self._status == Player.HAND_ONLY:
+            self._status = Player.PUBLISHED
+            if self._game is not None:
+                self._publish_turn = self._game._turns
+
+        if self._game is not None and self._game._trace is not None:
+            self._game._trace(events.Publish(self._game._turns,
+                self._index, tuple(tuple(chip.id for chip in combination)
+                    for combination in combinations)))
+        logger.debug("Player %d publishes: %s", self._index, combinations)
+        logger.debug("Player %d hand: %s", self._index, self._hand)
+
+    def _lay_off(self, chips):
+        """Lay off as many of `chips` as possible to the yards of the game and
+        return the remaining ones."""
+        yards = self._game._yards
+        rest = list(chips)
+        laid_off = True
+        while laid_off:
+            # laying off to a run may let it accept further chips
+            laid_off = False
+            for chip in rest:
+                position = yards.accepting(chip)
+                if position is not None:
+                    self._lay_off_chip(chip, position)
+                    rest.remove(chip)
+                    laid_off = True
+                    break
+        return rest
+
+    def _lay_off_chip(self, chip, position):
+        """Move the chip from the hand to the combination at `position` of
+        the yards."""
+        game = self._game
+        yards = game._yards
+        combination = yards[position]
+        # combinations are immutable, replace it on the owner's yard, too
+        yard = game._players[yards.owners[position]]._yard
+        index = yard.index(combination)
+        yard[index] = yards.lay_off(position, chip)
+        if self._hand.journal is not None:
+            self._hand.journal.record(yard.__setitem__, index, combination)
+        self._hand.remove(chip)
+        game._reveal(self, (chip,))
+        if game._trace is not None:
+            game._trace(events.LayOff(game._turns, self._index, chip.id,
+                position))
+        logger.debug("Player %d lays off %r to %s", self._index, chip,
+                game._yards[position])
+
+    def _replay(self, decision):
+        """Apply a cached decision to the current hand and select the chip to
+        drop among its rest."""
+        chips = {}
+        for chip in self._hand:
+            chips.setdefault(chip.code_index, []).append(chip)
+
+        combinations = [combination(*[chips[code].pop() for code in codes])
+                for codes in decision.combinations]
+        if combinations:
+            self._publish(combinations)
+
+        self._find_drop_chip([chips[code].pop() for code in decision.rest])
 
     def _find_drop_chip(self, chips_):
         """Helper routine to find the chip that is most unlikely to be combined
@@ -177,109 +351,347 @@ class Player(object):
             # dropped a final chip.
             self._drop_chip = None
             return
-        chips = chips_[:]
-        while len(chips) > 1:
-            for pair in combinations(chips, 2):
-                if Chip.remote_candidates(*pair):
-                    chips.remove(pair[0])
-                    chips.remove(pair[1])
-                    break
-            else:
-                # no remote candidates found, pick any of the remaining chips
-                # TODO: this should depending on player stage, see below
-                random.shuffle(chips)
-                self._drop_chip = chips[0]
-                return
-        if len(chips) == 1:
-            self._drop_chip = chips[0]
-
-        # all chips are remote candidates, pick the smallest one
-        # TODO this could be adjusted to the stage of the player (about to
-        # publish, or trying to finish).
-        self._drop_chip = sorted(chips_, key=attrgetter("value"))[0]
+        # TODO: the scoring could be adjusted to the stage of the player
+        # (about to publish, or trying to finish).
+        self._drop_chip = self._drop_selector.select(chips_,
+                self._hand.degrees(chips_), self._random,
+                [self._knowledge.outs(chip) for chip in chips_])
 
 
 class Pool(list):
     """Container holding chips that players draw from and drop to.
-    By default, a double-deck pool is initialized, holding 2x52 chips. If a
-    list of chips is passed, the pool is created from the list. This is most
-    useful for testing."""
-
-    def __init__(self, chips=None):
+    By default, all decks of the active chips (see `pyrummy.rules`) are
+    initialized, with the standard rules 2x52 chips. If a list of chips is
+    passed, the pool is created from the list. This is most useful for
+    testing.
+    Chips are drawn using `rng`, a `random.Random` instance. If none is given,
+    the global state of the `random` module is used.
+    If a `journal` (see `pyrummy.state.Journal`) is set, every draw and drop
+    is recorded to it. If `instruments` (see `pyrummy.instruments`) are set,
+    the draws are timed."""
+
+    def __init__(self, chips=None, rng=None):
+        self.journal = None
+        self.instruments = None
+        self._random = random if rng is None else rng
         if chips is None:
             for value in range(Chip.MIN_VALUE, Chip.MAX_VALUE+1):
                 for color in range(Chip.NR_COLORS):
-                    for index in range(2):
+                    for index in range(Chip.NR_DECKS):
                         chip = Chip(color, value, index=index)
                         self.append(chip)
         else:
             self.extend(chips)
-        logger.debug("Pool contains: {}".format(self))
+        logger.debug("Pool contains: %s", self)
 
     def pop_random_chip(self):
-        random.shuffle(self)
-        return self.pop()
+        """Remove a uniformly chosen chip from the pool and return it. The
+        chosen chip is swapped with the last one beforehand, hence every draw
+        costs O(1), no matter how many chips were dropped to the pool."""
+        instruments = self.instruments
+        if instruments is None:
+            return self._take(self._random.randrange(len(self)))
+        start = time.perf_counter()
+        chip = self._take(self._random.randrange(len(self)))
+        instruments.time("draw", start)
+        return chip
+
+    def take(self, chip):
+        """Remove the given chip from the pool and return it, like
+        `pop_random_chip`. Costs O(n) for finding the chip."""
+        return self._take(self.index(chip))
+
+    def _take(self, index):
+        self[index], self[-1] = self[-1], self[index]
+        chip = self.pop()
+        if self.journal is not None:
+            self.journal.record(self._undraw, index, chip)
+        return chip
+
+    def append(self, chip):
+        super().append(chip)
+        if self.journal is not None:
+            self.journal.record(self.pop)
+
+    def _undraw(self, index, chip):
+        super().append(chip)
+        self[index], self[-1] = self[-1], self[index]
 
 
 class Game(object):
     """Create a game and run it.
     There are two options for game generation. One can specify a number of
-    players between 1 and 6. The standard pool (two decks with 52 chips each)
-    is created and each player are given random hands of 14 chips.
+    players. The standard pool (two decks with 52 chips each) is created and
+    each player are given random hands of `HAND_START_SIZE` chips.
     Another option (which is particularly useful for testing) is to pass a
     custum `Pool` instance and a `hands` list that is assigns a custom hand to
     each player.
+    If a `seed` is given, the game is exactly reproducible: the standard pool
+    and all players draw their random numbers from a `random.Random` instance
+    created with the seed. All players use the given search `engine` and
+    decision `cache`.
+    By default, every seat is taken by a `Player`. Alternative player classes
+    (callables with the signature of `Player`) can be passed as
+    `player_classes`, one per seat.
+    If a `trace` callable is given, it is passed a structured event (see
+    `pyrummy.events`) for every action of the game. If `instruments` (see
+    `pyrummy.instruments`) are given, the hot paths are timed and counted.
+    The game can be played turn by turn; `snapshot` and `restore` allow to
+    explore hypothetical turns.
+    Every player's `pyrummy.knowledge.Knowledge` of the unseen chips is
+    updated on every event visible to him.
+    Rule variants are played by passing a `pyrummy.rules.RuleSet` as `rules`,
+    which overrides `nr_players`, `THRESHOLD` and `HAND_START_SIZE`. Its chips
+    must have been put to use before (see `pyrummy.rules.use`).
+    A game ends when a player wins, or without winner
+    - after `max_turns` turns (if given),
+    - when the pool is exhausted, i.e. the next player cannot draw, or
+    - when for `stalemate_rounds` rounds (if given), no player changed his
+      hand, i.e. every player dropped a chip of the code he drew and neither
+      published nor laid off chips.
+    The reason is reported as `outcome`.
     A game organizes all player instances, the pool and the yards."""
 
-    THRESHOLD = 40
-    HAND_START_SIZE = 14
-
-    def __init__(self, nr_players=4, pool=None, hands=None):
+    # defaults for games created without rule set
+    THRESHOLD = STANDARD.threshold
+    HAND_START_SIZE = STANDARD.hand_size
+
+    # outcome enum
+    WON = "won"
+    MAX_TURNS = "max_turns"
+    POOL_EXHAUSTED = "pool_exhausted"
+    STALEMATE = "stalemate"
+    # in the order of their codes in records and datasets
+    OUTCOMES = (WON, MAX_TURNS, POOL_EXHAUSTED, STALEMATE)
+
+    def __init__(self, nr_players=4, pool=None, hands=None, seed=None,
+            engine=None, trace=None, cache=None, player_classes=None,
+            instruments=None, rules=None, max_turns=None,
+            stalemate_rounds=None):
         if (pool is None) ^ (hands is None):
             raise ValueError("Specify either both pool and hands or none.")
-        self._yards = {}
-        self._pool = Pool() if pool is None else pool
+        if rules is not None:
+            validate(rules)
+            if chip_set(rules) != chip_set(active()):
+                raise ValueError("The chips of the rules are not in use.")
+            nr_players = rules.players
+        self._rules = rules
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._trace = trace
+        self._instruments = instruments
+        self._yards = Yards()
+        self._pool = Pool(rng=self._random) if pool is None else pool
+        self._pool.instruments = instruments
 
         self._nr_players = nr_players if hands is None else len(hands)
         self._players = self._nr_players * [None]
+        self._player_classes = self._nr_players * [Player] if \
+                player_classes is None else list(player_classes)
+        if len(self._player_classes) != self._nr_players:
+            raise ValueError("Specify one player class per player.")
         self._current_player_index = 0
+        self._engine = engine
+        self._cache = cache
 
         self._winner = None
+        self._turns = 0
+        self._journal = None
+
+        self._max_turns = max_turns
+        self._stalemate_rounds = stalemate_rounds
+        self._outcome = None
+        # turns in a row without change of the player's hand, and the chip
+        # drawn and the hand size before the draw in the current turn
+        self._idle_turns = 0
+        self._drawn = None
+        self._hand_size = 0
 
         self._generate(hands)
 
     def _generate(self, hands):
-        logger.info("Generating game with {} player{}...".format(
-            self._nr_players, "s" if self._nr_players > 1 else ""))
+        logger.info("Generating game with %d player(s)...", self._nr_players)
         if hands is None:
             for i in range(self._nr_players):
                 hand = []
-                for _ in range(Game.HAND_START_SIZE):
+                for _ in range(self.rules.hand_size):
                     hand.append(self._pool.pop_random_chip())
-                self._players[i] = Player(i, hand, self)
+                self._players[i] = self._player_classes[i](i, hand, self,
+                        self._engine, cache=self._cache)
         else:
             for i, hand in enumerate(hands):
-                self._players[i] = Player(i, hand, self)
+                self._players[i] = self._player_classes[i](i, hand, self,
+                        self._engine, cache=self._cache)
+
+    @property
+    def rules(self):
+        """The `pyrummy.rules.RuleSet` of the game. Without rule set, the
+        active chips are played with the current class defaults."""
+        if self._rules is not None:
+            return self._rules
+        return active()._replace(players=self._nr_players,
+                hand_size=Game.HAND_START_SIZE, threshold=Game.THRESHOLD)
+
+    @property
+    def threshold(self):
+        return Game.THRESHOLD if self._rules is None else self._rules.threshold
+
+    @property
+    def outcome(self):
+        """None while the game is running, afterwards one of `WON`,
+        `MAX_TURNS`, `POOL_EXHAUSTED` and `STALEMATE`."""
+        return self._outcome
 
     def run(self):
         """Main game routine. The players are taking turns with drawing,
         playing and dropping. The first player who gets rid of his hand wins."""
+        instruments = self._instruments
+        if instruments is not None:
+            start = time.perf_counter()
+        self.start()
+        while not self.turn():
+            pass
+        if instruments is not None:
+            instruments.time("game", start)
+
+    def start(self):
+        """Announce the start of the game. Called by `run`; when driving the
+        game turn by turn, call it before the first turn."""
         logger.info("Starting the game...")
-        while True:
-            current_player = self._players[self._current_player_index]
-            current_player.draw(self._pool.pop_random_chip())
-            current_player.play()
-            self._pool.append(current_player.drop())
-            logger.debug("Pool contains: {}".format(self._pool))
-
-            if current_player.victorious():
-                self._winner = current_player
-                logger.info("Player {} wins!".format(self._current_player_index))
-                break
-
-            self._current_player_index = (self._current_player_index + 1) %\
-                    self._nr_players
+        if self._trace is not None:
+            self._trace(events.GameStart(self._seed, tuple(tuple(chip.id for
+                chip in player._hand) for player in self._players),
+                self.rules))
+
+    def turn(self):
+        """Let the current player draw, play and drop. Returns True if the
+        game is over (see `outcome`)."""
+        if self._outcome is None and not self._pool:
+            self._end(Game.POOL_EXHAUSTED)
+        if self._outcome is not None:
+            return True
+        self.begin_turn().play()
+        return self.end_turn()
+
+    def begin_turn(self, chip=None):
+        """First half of `turn`: the current player draws a chip, the given
+        `chip` or a random one. Returns the player, who is expected to `play`
+        before `end_turn` is called."""
+        self._turns += 1
+        current_player = self._players[self._current_player_index]
+        chip = self._pool.pop_random_chip() if chip is None else\
+                self._pool.take(chip)
+        self._drawn = chip
+        self._hand_size = len(current_player._hand)
+        current_player.draw(chip)
+        if self._trace is not None:
+            self._trace(events.Draw(self._turns, self._current_player_index,
+                chip.id))
+        return current_player
+
+    def end_turn(self):
+        """Second half of `turn`: the current player drops the chip chosen
+        while playing. Returns True if the game is over (see `outcome`)."""
+        trace = self._trace
+        current_player = self._players[self._current_player_index]
+        chip = current_player.drop()
+        if trace is not None:
+            trace(events.Drop(self._turns, self._current_player_index,
+                None if chip is None else chip.id))
+        if chip is not None:
+            self._pool.append(chip)
+        logger.debug("Pool contains: %s", self._pool)
+
+        if current_player.victorious():
+            self._winner = current_player
+            self._outcome = Game.WON
+            if trace is not None:
+                trace(events.Win(self._turns, self._current_player_index))
+            logger.info("Player %d wins!", self._current_player_index)
+            return True
+
+        if chip is not None and chip.code_index == self._drawn.code_index and\
+                len(current_player._hand) == self._hand_size:
+            self._idle_turns += 1
+        else:
+            self._idle_turns = 0
+
+        self._current_player_index = (self._current_player_index + 1) %\
+                self._nr_players
+
+        if self._stalemate_rounds is not None and self._idle_turns >= \
+                self._stalemate_rounds * self._nr_players:
+            return self._end(Game.STALEMATE)
+        if self._max_turns is not None and self._turns >= self._max_turns:
+            return self._end(Game.MAX_TURNS)
+        if not self._pool:
+            return self._end(Game.POOL_EXHAUSTED)
+        return False
+
+    def _end(self, outcome):
+        """End the game without winner. Returns True."""
+        self._outcome = outcome
+        if self._trace is not None:
+            self._trace(events.End(self._turns, outcome))
+        logger.info("Game over without winner: %s", outcome)
+        return True
+
+    def _reveal(self, player, chips):
+        """Update the knowledge of all players but `player` about the chips he
+        has put on the yards."""
+        for other in self._players:
+            if other is not player:
+                knowledge = other._knowledge
+                for chip in chips:
+                    knowledge.see(chip)
+
+    def snapshot(self):
+        """Returns a `pyrummy.state.Snapshot` of the current state that can be
+        passed to `restore`. Starting with the first snapshot, all
+        modifications of hands, yards, pool and knowledge are journaled, s.t.
+        restoring costs O(changes) since the snapshot. Call
+        `release` to stop journaling when no snapshot is needed anymore."""
+        if self._journal is None:
+            self._journal = Journal()
+            self._pool.journal = self._journal
+            self._yards.journal = self._journal
+            for player in self._players:
+                player._hand.journal = self._journal
+                player._knowledge.journal = self._journal
+        return Snapshot(len(self._journal), self._current_player_index,
+                self._winner, self._turns, self._outcome, self._idle_turns,
+                self._drawn, self._hand_size,
+                (self._random.getstate(), self._pool._random.getstate()),
+                tuple((p._status, p._publish_turn, p._drop_chip) for p in
+                    self._players))
+
+    def restore(self, snapshot):
+        """Revert the game to the state of `snapshot`. Snapshots taken after
+        `snapshot` become invalid."""
+        self._journal.rollback(snapshot.length)
+        self._current_player_index = snapshot.current_player_index
+        self._winner = snapshot.winner
+        self._turns = snapshot.turns
+        self._outcome = snapshot.outcome
+        self._idle_turns = snapshot.idle_turns
+        self._drawn = snapshot.drawn
+        self._hand_size = snapshot.hand_size
+        self._random.setstate(snapshot.random_states[0])
+        self._pool._random.setstate(snapshot.random_states[1])
+        for player, state in zip(self._players, snapshot.players):
+            player._status, player._publish_turn, player._drop_chip = state
+
+    def release(self):
+        """Stop journaling and invalidate all snapshots."""
+        self._journal = None
+        self._pool.journal = None
+        self._yards.journal = None
+        for player in self._players:
+            player._hand.journal = None
+            player._knowledge.journal = None
 
 
 def main():
+    logging.basicConfig(level=logging.DEBUG,
+            filename="log_{}".format(int(time.time())))
     Game(4).run()
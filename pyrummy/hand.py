@@ -0,0 +1,101 @@
+"""Incrementally indexed hand of a player."""
+
+from pyrummy.chips import Chip
+from pyrummy.rules import on_use
+
+
+def _build_remote_table():
+    """For every code index, the code indices of its remote candidates."""
+    chips = [Chip(color, value) for value in range(Chip.MIN_VALUE,
+        Chip.MAX_VALUE + 1) for color in range(Chip.NR_COLORS)]
+    table = NR_CODES * [None]
+    for chip in chips:
+        table[chip.code_index] = tuple(other.code_index for other in chips if
+                Chip.remote_candidates(chip, other))
+    return table
+
+
+@on_use
+def _configure():
+    global NR_CODES, REMOTE_CODE_INDICES
+    NR_CODES = (Chip.MAX_VALUE - Chip.MIN_VALUE + 1) * Chip.NR_COLORS
+    REMOTE_CODE_INDICES = _build_remote_table()
+
+
+class Hand(list):
+    """List of chips on a player's hand that keeps an index of its chips up to
+    date whenever a chip is appended or removed, at a cost of O(1) per chip:
+    - `chips` maps chip ids to chips
+    - `mask` is the bitset of chip ids (see `pyrummy.bitset`)
+    - `counts` holds the number of chips per code index
+    - `remote` holds per code index the number of chips on the hand that are
+      remote candidates of the code (i.e. that form pairs or partial runs
+      with a chip of the code)
+    Chips must only be added via `append`/`extend` and removed via `remove`,
+    other list modifications bypass the index.
+    If a `journal` (see `pyrummy.state.Journal`) is set, every modification is
+    recorded to it."""
+
+    def __init__(self, chips=()):
+        super().__init__()
+        self.journal = None
+        self.chips = {}
+        self.mask = 0
+        self.counts = NR_CODES * [0]
+        self.remote = NR_CODES * [0]
+        self.extend(chips)
+
+    def append(self, chip):
+        super().append(chip)
+        self._index(chip, 1)
+        if self.journal is not None:
+            self.journal.record(self._unappend)
+
+    def extend(self, chips):
+        for chip in chips:
+            self.append(chip)
+
+    def remove(self, chip):
+        position = self.index(chip)
+        del self[position]
+        self._index(chip, -1)
+        if self.journal is not None:
+            self.journal.record(self._reinsert, position, chip)
+
+    def _unappend(self):
+        self._index(super().pop(), -1)
+
+    def _reinsert(self, position, chip):
+        super().insert(position, chip)
+        self._index(chip, 1)
+
+    def _index(self, chip, delta):
+        if delta > 0:
+            self.chips[chip.id] = chip
+        else:
+            del self.chips[chip.id]
+        self.mask ^= 1 << chip.id
+        code = chip.code_index
+        self.counts[code] += delta
+        remote = self.remote
+        for other in REMOTE_CODE_INDICES[code]:
+            remote[other] += delta
+
+    def degrees(self, chips):
+        """Returns for each of `chips` the number of its remote candidates
+        among `chips`. `chips` must be a subset of the hand; the contributions
+        of the other hand chips are subtracted from the index."""
+        mask = 0
+        for chip in chips:
+            mask |= 1 << chip.id
+        excluded = self.mask & ~mask
+        remote = self.remote
+        if excluded:
+            remote = remote[:]
+            while excluded:
+                chip_id = excluded.bit_length() - 1
+                excluded ^= 1 << chip_id
+                for other in REMOTE_CODE_INDICES[
+                        self.chips[chip_id].code_index]:
+                    remote[other] -= 1
+        return [remote[chip.code_index] for chip in chips]
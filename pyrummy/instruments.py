@@ -0,0 +1,73 @@
+"""Timers and counters for the hot paths of a game.
+A game created with `Instruments` accounts every call of its phases:
+- "game": `Game.run`
+- "draw": `Pool.pop_random_chip`
+- "play": `Player.play`, including "search" and "drop"
+- "search": the search for constellations of the engine
+- "drop": `Player._find_drop_chip`
+and observes the quantities
+- "constellations": constellations explored per search
+- "hand_chips": hand chips scanned per search
+- "drop_candidates": chips scanned per drop choice
+Without instruments, the cost is a single comparison per call."""
+
+from collections import defaultdict
+import time
+
+
+class Instruments(object):
+    """Collects the number of calls and the total time per phase, and the
+    total and maximum per observed quantity. `snapshot` returns the state as
+    plain dict, which can be sent between processes and aggregated by
+    `merge`."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.totals = defaultdict(int)
+        self.maxima = defaultdict(int)
+
+    def time(self, phase, start):
+        """Account a call of `phase` started at `time.perf_counter()` value
+        `start`."""
+        self.calls[phase] += 1
+        self.seconds[phase] += time.perf_counter() - start
+
+    def observe(self, quantity, value):
+        self.totals[quantity] += value
+        if value > self.maxima[quantity]:
+            self.maxima[quantity] = value
+
+    def snapshot(self):
+        return {"calls": dict(self.calls), "seconds": dict(self.seconds),
+                "totals": dict(self.totals), "maxima": dict(self.maxima)}
+
+    def merge(self, snapshot):
+        """Add the state of a snapshot (of other instruments) to this one."""
+        for phase, calls in snapshot["calls"].items():
+            self.calls[phase] += calls
+        for phase, seconds in snapshot["seconds"].items():
+            self.seconds[phase] += seconds
+        for quantity, total in snapshot["totals"].items():
+            self.totals[quantity] += total
+        for quantity, maximum in snapshot["maxima"].items():
+            if maximum > self.maxima[quantity]:
+                self.maxima[quantity] = maximum
+
+    def report(self):
+        """Returns a dict of the calls, total and mean time (in microseconds)
+        per phase and the mean per observed quantity."""
+        play_calls = self.calls.get("play", 0)
+        return {
+                "phases": {phase: {"calls": calls,
+                    "seconds": self.seconds[phase],
+                    "mean_us": 1e6 * self.seconds[phase] / calls}
+                    for phase, calls in self.calls.items()},
+                "quantities": {quantity: {"total": total,
+                    "max": self.maxima[quantity],
+                    "mean": total / play_calls if play_calls else None}
+                    for quantity, total in self.totals.items()},
+                }
@@ -0,0 +1,56 @@
+"""What a player knows about the chips he cannot see."""
+
+from pyrummy.chips import Chip
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global NR_CODES, REMOTE_CODE_INDICES
+    from pyrummy.hand import NR_CODES, REMOTE_CODE_INDICES
+
+
+class Knowledge(object):
+    """Tracks per code index the number of copies that are unseen by the
+    player, i.e. neither on his hand nor on any yard. Every unseen copy is in
+    the pool or on an opponent's hand and may hence still be drawn. The game
+    updates the counts on every event visible to the player at a cost of O(1)
+    per chip: the player's draws and drops, and the chips published or laid
+    off by the opponents.
+    If a `journal` (see `pyrummy.state.Journal`) is set, every update is
+    recorded to it."""
+
+    def __init__(self):
+        self.journal = None
+        self.unseen = NR_CODES * [Chip.NR_DECKS]
+        self.total = NR_CODES * Chip.NR_DECKS
+
+    def see(self, chip):
+        """The chip became visible to the player."""
+        self._update(chip.code_index, -1)
+
+    def hide(self, chip):
+        """The chip left the sight of the player, f.i. by being dropped."""
+        self._update(chip.code_index, 1)
+
+    def _update(self, code, delta):
+        self._count(code, delta)
+        if self.journal is not None:
+            self.journal.record(self._count, code, -delta)
+
+    def _count(self, code, delta):
+        self.unseen[code] += delta
+        self.total += delta
+
+    def probability(self, chip):
+        """Returns the probability that a randomly chosen unseen chip shares
+        the code of `chip`."""
+        return self.unseen[chip.code_index] / self.total if self.total else 0
+
+    def outs(self, chip):
+        """Returns the number of unseen chips that are remote candidates of
+        `chip` (see `Chip.remote_candidates`), i.e. that could still be
+        combined with it."""
+        unseen = self.unseen
+        return sum(unseen[code] for code in
+                REMOTE_CODE_INDICES[chip.code_index])
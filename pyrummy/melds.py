@@ -0,0 +1,65 @@
+"""Catalog of every legal meld, built at import and whenever other chips are
+put to use (see `pyrummy.rules`).
+A meld is a run of at least 3 chips of one color or a book of at least 3
+chips of one value and different colors, identified by the code indices of
+its chips (see `Chip.code_index`). The catalog is indexed by the codes of the
+highest chips, hence the engines complete a chip to the melds it tops by
+lookup instead of matching candidates pairwise."""
+
+from collections import namedtuple
+
+from pyrummy.chips import Chip
+from pyrummy.rules import on_use
+
+
+MIN_LENGTH = 3
+
+# `codes` are the code indices of the chips in ascending order, `masks` the
+# bitsets of the chip ids per code (see `pyrummy.bitset`).
+Meld = namedtuple("Meld", "codes value masks")
+
+
+def _meld(chips):
+    codes = tuple(sorted(chip.code_index for chip in chips))
+    return Meld(codes, sum(chip.value for chip in chips),
+            tuple(((1 << Chip.NR_DECKS) - 1) << code * Chip.NR_DECKS for
+                code in codes))
+
+
+def _build_catalog():
+    values = range(Chip.MIN_VALUE, Chip.MAX_VALUE + 1)
+    colors = range(Chip.NR_COLORS)
+    catalog = []
+    for color in colors:
+        for low in values:
+            for high in range(low + MIN_LENGTH - 1, Chip.MAX_VALUE + 1):
+                catalog.append(_meld([Chip(color, value) for value in
+                    range(low, high + 1)]))
+    for value in values:
+        for mask in range(1 << Chip.NR_COLORS):
+            book = [Chip(color, value) for color in colors if
+                    mask & 1 << color]
+            if len(book) >= MIN_LENGTH:
+                catalog.append(_meld(book))
+
+    nr_codes = len(values) * Chip.NR_COLORS
+    by_top = [[] for _ in range(nr_codes)]
+    for meld in catalog:
+        # codes are ordered by value, the last one has the highest value; in
+        # a book, all codes do
+        top_value = meld.codes[-1] // Chip.NR_COLORS
+        for code in meld.codes:
+            if code // Chip.NR_COLORS == top_value:
+                by_top[code].append(meld)
+    for melds in by_top:
+        # longest first; stable, hence runs before books of equal length
+        melds.sort(key=lambda meld: -len(meld.codes))
+    return tuple(catalog), tuple(map(tuple, by_top))
+
+
+# `CATALOG` holds all melds and `BY_TOP` per code index the melds in which the
+# code has the highest value, longest first.
+@on_use
+def _configure():
+    global CATALOG, BY_TOP
+    CATALOG, BY_TOP = _build_catalog()
@@ -0,0 +1,170 @@
+"""Player choosing the chip to drop by Monte Carlo rollouts.
+For every candidate drop, the rest of the game is played out many times from
+the player's point of view: the chips the player cannot see (the pool and the
+opponents' hands) are shuffled and dealt anew for every rollout. The candidate
+winning most rollouts is dropped.
+Rollouts are independent, hence they can be distributed to any
+`concurrent.futures.Executor`. The decision is anytime: it is taken when the
+time `budget` is used up, based on the rollouts completed by then."""
+
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, wait
+import itertools
+import os
+import random
+import time
+
+from pyrummy.bitset import BitsetEngine
+from pyrummy.chips import Chip, combination
+from pyrummy.game import Game, Player, Pool
+from pyrummy.rules import active
+
+
+# Everything a rollout needs to know, as seen by `player`. Chips are given by
+# id; `yards` holds per player a tuple of combinations, `hand_sizes` and
+# `statuses` hold one entry per player.
+Position = namedtuple("Position",
+        "player hand unknown hand_sizes yards statuses threshold")
+
+# Result of a rollout: whether the player won and the value of his hand at the
+# end of the rollout.
+Outcome = namedtuple("Outcome", "won hand_value")
+
+_engine = BitsetEngine()
+
+
+def rollout(position, drop, seed, max_turns):
+    """Play the game from `position` after the player dropped the chip with
+    id `drop`, for at most `max_turns` turns. Returns an `Outcome`.
+    No class defaults are modified, hence rollouts can run concurrently
+    within the process of the game being played."""
+    rng = random.Random(seed)
+    unknown = list(position.unknown)
+    rng.shuffle(unknown)
+
+    hands = []
+    for player, size in enumerate(position.hand_sizes):
+        if player == position.player:
+            hands.append([Chip.from_id(i) for i in position.hand if i != drop])
+        else:
+            hands.append([Chip.from_id(i) for i in unknown[:size]])
+            del unknown[:size]
+    pool = Pool([Chip.from_id(i) for i in unknown] + [Chip.from_id(drop)],
+            rng)
+
+    game = Game(pool=pool, hands=hands, seed=rng.getrandbits(32),
+            engine=_engine, rules=active()._replace(
+                threshold=position.threshold, players=len(hands)),
+            max_turns=max_turns)
+    for player, yard, status in zip(game._players, position.yards,
+            position.statuses):
+        player._yard = [combination(*[Chip.from_id(i) for i in ids]) for
+                ids in yard]
+        for meld in player._yard:
+            game._yards.publish(player._index, meld)
+            # the yards are visible to everyone
+            for other in game._players:
+                for chip in meld:
+                    other._knowledge.see(chip)
+        player._status = status
+    game._current_player_index = (position.player + 1) % len(hands)
+
+    while not game.turn():
+        pass
+
+    player = game._players[position.player]
+    return Outcome(game._winner is player, player.hand_value())
+
+
+class MonteCarloPlayer(Player):
+    """Player that evaluates every chip he could drop by rollouts (see
+    `rollout`) within `budget` seconds per decision. Rollouts are submitted to
+    `executor`, with at most `max_pending` of them in flight; without
+    executor, they are run one after the other in the current process. If
+    some candidate was not played out in time, or there is no choice to make,
+    the chip is chosen by the `pyrummy.drop.DropSelector`.
+    Decisions depend on the rollouts, hence they are never cached."""
+
+    def __init__(self, index, hand, game=None, engine=None,
+            drop_selector=None, cache=None, threshold=None, budget=0.1,
+            executor=None, max_pending=None, max_turns=200):
+        # `cache` is accepted for the signature of `Player`, but not used
+        super().__init__(index, hand, game, engine, drop_selector,
+                threshold=threshold)
+        self._budget = budget
+        self._executor = executor
+        self._max_pending = 2 * (os.cpu_count() or 1) if max_pending is None\
+                else max_pending
+        self._max_turns = max_turns
+        # separate stream for the rollout seeds, s.t. the number of rollouts
+        # (which depends on timing) does not affect the course of the game
+        self._rollout_random = random.Random(self._random.getrandbits(64))
+        self.rollouts = 0
+
+    def position(self):
+        """Returns the current `Position` as seen by the player."""
+        game = self._game
+        players = game._players
+        unknown = [chip.id for chip in game._pool]
+        for player in players:
+            if player is not self:
+                unknown.extend(chip.id for chip in player._hand)
+        return Position(self._index, tuple(chip.id for chip in self._hand),
+                tuple(unknown), tuple(len(p._hand) for p in players),
+                tuple(tuple(tuple(chip.id for chip in c) for c in p._yard) for
+                    p in players),
+                tuple(p._status for p in players), game.threshold)
+
+    def _find_drop_chip(self, chips_):
+        candidates = {}
+        for chip in chips_:
+            candidates.setdefault(chip.code_index, chip)
+        candidates = list(candidates.values())
+        if self._game is None or len(candidates) < 2:
+            super()._find_drop_chip(chips_)
+            return
+
+        outcomes = {chip: [] for chip in candidates}
+        position = self.position()
+        deadline = time.perf_counter() + self._budget
+        schedule = itertools.cycle(candidates)
+        seed = self._rollout_random.getrandbits
+
+        if self._executor is None:
+            while time.perf_counter() < deadline:
+                chip = next(schedule)
+                outcomes[chip].append(rollout(position, chip.id,
+                    seed(32), self._max_turns))
+        else:
+            pending = {}
+
+            def submit():
+                chip = next(schedule)
+                pending[self._executor.submit(rollout, position, chip.id,
+                    seed(32), self._max_turns)] = chip
+
+            for _ in range(self._max_pending):
+                submit()
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, remaining, FIRST_COMPLETED)
+                for future in done:
+                    outcomes[pending.pop(future)].append(future.result())
+                    submit()
+            for future in pending:
+                future.cancel()
+
+        self.rollouts = sum(len(o) for o in outcomes.values())
+        if not all(outcomes.values()):
+            super()._find_drop_chip(chips_)
+            return
+
+        def score(chip):
+            results = outcomes[chip]
+            wins = sum(o.won for o in results)
+            value = sum(o.hand_value for o in results)
+            return wins / len(results), -value / len(results)
+
+        self._drop_chip = max(candidates, key=score)
@@ -0,0 +1,290 @@
+"""Compact binary record of games.
+A `RecordWriter` is a trace (see `pyrummy.events`) that stores the events of
+any number of games to a file, using one byte per chip id. A
+`RecordReader` memory-maps such a file and iterates its games lazily; the
+events of a game are only decoded when iterated. `replay` restores a recorded
+game into a `Game`.
+
+File layout (integers are little endian):
+    header: MAGIC, VERSION (uint8)
+    per game: payload length (uint32), payload
+Game payload:
+    seed flag (uint8, 0 if the seed is None), seed (uint64)
+    rule set (see `pyrummy.rules.RuleSet`): decks, colors, min_value,
+        max_value, hand_size (uint8 each), threshold (uint32), players (uint8)
+    number of players (uint8), per player: hand size (uint8), chip ids
+    per event: tag (uint8) followed by
+        DRAW: player (uint8), chip id
+        PUBLISH: number of combinations (uint8), per combination: size
+                 (uint8), chip ids
+        LAY_OFF: chip id, position of the combination (uint8)
+        DROP: chip id, or NO_CHIP
+        WIN: nothing
+        END: outcome (uint8, index in `Game.OUTCOMES`)
+Turn numbers are not stored, they are counted by the DRAW events. Chip ids
+must be below NO_CHIP, hence games of rule sets with more chips cannot be
+recorded."""
+
+from collections import namedtuple
+import mmap
+import struct
+
+from pyrummy import events
+from pyrummy.chips import Chip, combination
+from pyrummy.game import Game, Pool
+from pyrummy.rules import RuleSet
+
+
+MAGIC = b"PYRG"
+VERSION = 2
+
+DRAW = 1
+PUBLISH = 2
+DROP = 3
+WIN = 4
+LAY_OFF = 5
+END = 6
+
+NO_CHIP = 0xff
+
+_HEADER = struct.Struct("<4sB")
+_LENGTH = struct.Struct("<I")
+_SEED = struct.Struct("<BQ")
+_RULES = struct.Struct("<5BIB")
+
+# One turn of a recorded game. `combinations` is a tuple of tuples of chip
+# ids, `drop` is None if the player dropped no chip. `lay_offs` is a tuple of
+# pairs of chip id and position of the combination in the yards.
+Turn = namedtuple("Turn", "turn player draw combinations drop lay_offs")
+
+
+class RecordWriter(object):
+    """Trace writing the events of games to the file at `path`. The events of
+    a game are buffered and written when the next game starts or the writer
+    is closed. Use as context manager or call `close()` when finished."""
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION))
+        self._buffer = None
+
+    def __call__(self, event):
+        buffer = self._buffer
+        event_type = type(event)
+        if event_type is events.Draw:
+            buffer += bytes((DRAW, event.player, event.chip))
+        elif event_type is events.Drop:
+            buffer += bytes((DROP, NO_CHIP if event.chip is None else
+                event.chip))
+        elif event_type is events.Publish:
+            buffer.append(PUBLISH)
+            buffer.append(len(event.combinations))
+            for combination in event.combinations:
+                buffer.append(len(combination))
+                buffer += bytes(combination)
+        elif event_type is events.LayOff:
+            buffer += bytes((LAY_OFF, event.chip, event.combination))
+        elif event_type is events.Win:
+            buffer.append(WIN)
+        elif event_type is events.End:
+            buffer += bytes((END, Game.OUTCOMES.index(event.outcome)))
+        elif event_type is events.GameStart:
+            self.flush()
+            seed = event.seed
+            if seed is not None and not (isinstance(seed, int) and
+                    0 <= seed < 2**64):
+                raise ValueError("Seeds must be None or integers in "
+                        "[0, 2**64).")
+            rules = event.rules
+            if rules.decks * rules.colors * (rules.max_value -
+                    rules.min_value + 1) > NO_CHIP:
+                raise ValueError("Games with more than {} chips cannot be "
+                        "recorded.".format(NO_CHIP))
+            buffer = self._buffer = bytearray(_SEED.pack(seed is not None,
+                seed or 0))
+            buffer += _RULES.pack(*rules)
+            buffer.append(len(event.hands))
+            for hand in event.hands:
+                buffer.append(len(hand))
+                buffer += bytes(hand)
+
+    def flush(self):
+        """Write the game recorded so far."""
+        if self._buffer is not None:
+            self._file.write(_LENGTH.pack(len(self._buffer)))
+            self._file.write(self._buffer)
+            self._buffer = None
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class GameRecord(object):
+    """A game within a memory-mapped record. Seed, rule set and hands are
+    decoded on creation, events and turns on iteration."""
+
+    def __init__(self, buffer, start, end):
+        self._buffer = buffer
+        self._end = end
+        has_seed, seed = _SEED.unpack_from(buffer, start)
+        self.seed = seed if has_seed else None
+        position = start + _SEED.size
+        self.rules = RuleSet(*_RULES.unpack_from(buffer, position))
+        position += _RULES.size
+        hands = []
+        for _ in range(buffer[position]):
+            size = buffer[position + 1]
+            hands.append(tuple(buffer[position + 2:position + 2 + size]))
+            position += 1 + size
+        self.hands = tuple(hands)
+        self._events = position + 1
+
+    def events(self):
+        """Iterate the events of the game (see `pyrummy.events`)."""
+        buffer = self._buffer
+        position = self._events
+        end = self._end
+        yield events.GameStart(self.seed, self.hands, self.rules)
+        turn = 0
+        player = None
+        while position < end:
+            tag = buffer[position]
+            if tag == DRAW:
+                turn += 1
+                player = buffer[position + 1]
+                yield events.Draw(turn, player, buffer[position + 2])
+                position += 3
+            elif tag == DROP:
+                chip = buffer[position + 1]
+                yield events.Drop(turn, player, None if chip == NO_CHIP else
+                        chip)
+                position += 2
+            elif tag == PUBLISH:
+                combinations = []
+                position += 2
+                for _ in range(buffer[position - 1]):
+                    size = buffer[position]
+                    combinations.append(tuple(
+                        buffer[position + 1:position + 1 + size]))
+                    position += 1 + size
+                yield events.Publish(turn, player, tuple(combinations))
+            elif tag == LAY_OFF:
+                yield events.LayOff(turn, player, buffer[position + 1],
+                        buffer[position + 2])
+                position += 3
+            elif tag == WIN:
+                yield events.Win(turn, player)
+                position += 1
+            elif tag == END:
+                yield events.End(turn, Game.OUTCOMES[buffer[position + 1]])
+                position += 2
+            else:
+                raise ValueError("Invalid tag {} at offset {}.".format(tag,
+                    position))
+
+    def turns(self):
+        """Iterate the `Turn`s of the game."""
+        turn = None
+        for event in self.events():
+            event_type = type(event)
+            if event_type is events.Draw:
+                turn = [event.turn, event.player, event.chip, (), []]
+            elif event_type is events.Publish:
+                turn[3] = event.combinations
+            elif event_type is events.LayOff:
+                turn[4].append((event.chip, event.combination))
+            elif event_type is events.Drop:
+                yield Turn(turn[0], turn[1], turn[2], turn[3], event.chip,
+                        tuple(turn[4]))
+
+    def winner(self):
+        """Returns the index of the winner, or None. Decodes all events."""
+        for event in self.events():
+            if type(event) is events.Win:
+                return event.player
+        return None
+
+    def outcome(self):
+        """Returns the outcome of the game (see `Game.outcome`), or None if
+        it was recorded before its end. Decodes all events."""
+        for event in self.events():
+            if type(event) is events.Win:
+                return Game.WON
+            if type(event) is events.End:
+                return event.outcome
+        return None
+
+
+class RecordReader(object):
+    """Memory-maps the record file at `path`. Iterating the reader yields a
+    `GameRecord` per game, skipping from game to game without decoding the
+    events. Use as context manager or call `close()` when finished."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._buffer = mmap.mmap(self._file.fileno(), 0,
+                access=mmap.ACCESS_READ)
+        magic, version = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not a version {} game record: {}".format(
+                VERSION, path))
+
+    def __iter__(self):
+        buffer = self._buffer
+        position = _HEADER.size
+        while position < len(buffer):
+            length, = _LENGTH.unpack_from(buffer, position)
+            position += _LENGTH.size
+            yield GameRecord(buffer, position, position + length)
+            position += length
+
+    def close(self):
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def replay(record, trace=None, until=None):
+    """Returns a `Game` in the state after turn `until` (default: the last
+    turn) of the `GameRecord` `record`. The hands are dealt and every turn is
+    played with the recorded draws, combinations, lay-offs and drops; a game
+    recorded to its end without winner ends with the recorded outcome. The
+    chips of the recorded rule set `record.rules` must be in use (see
+    `pyrummy.rules.use`). If a `trace` is given, it receives the events of
+    the replayed game."""
+    dealt = set(i for hand in record.hands for i in hand)
+    pool = Pool([chip for chip in Pool() if chip.id not in dealt])
+    game = Game(pool=pool, hands=[[Chip.from_id(i) for i in hand] for hand in
+        record.hands], seed=record.seed, trace=trace, rules=record.rules)
+    game.start()
+    for turn in record.turns():
+        if until is not None and turn.turn > until:
+            break
+        game._current_player_index = turn.player
+        player = game.begin_turn(Chip.from_id(turn.draw))
+        if turn.combinations:
+            player._publish([combination(*[Chip.from_id(i) for i in ids]) for
+                ids in turn.combinations])
+        for chip_id, position in turn.lay_offs:
+            player._lay_off_chip(Chip.from_id(chip_id), position)
+        player._drop_chip = None if turn.drop is None else\
+                Chip.from_id(turn.drop)
+        game.end_turn()
+    else:
+        outcome = record.outcome()
+        if outcome is not None and game.outcome is None:
+            game._end(outcome)
+    return game
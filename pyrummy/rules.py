@@ -0,0 +1,86 @@
+"""Rule variants of the game.
+A `RuleSet` defines the chips (number of decks, colors and the value range)
+as well as the hand size, the threshold for publishing and the number of
+players. The chips are shared by the whole process, hence only one set of
+chips is active at a time: `use` makes the chips of a rule set the active
+ones, rebuilding the interned chips and all tables derived from them. Since
+this invalidates all chips in use, it is never done implicitly: a game only
+accepts rules whose chips are active. Games with the same chips but different
+hand size, threshold or number of players can be played side by side."""
+
+from collections import namedtuple
+
+
+RuleSet = namedtuple("RuleSet",
+        "decks colors min_value max_value hand_size threshold players")
+RuleSet.__doc__ = """Rules of a game. `decks` is the number of chips sharing
+a code, `colors` the number of colors (at most `len(Chip.COLOR_CODES)`) and
+`min_value` and `max_value` delimit the values of the chips. Every player
+starts with `hand_size` chips and must combine chips of a value of at least
+`threshold` to publish."""
+
+STANDARD = RuleSet(decks=2, colors=4, min_value=1, max_value=13, hand_size=14,
+        threshold=40, players=4)
+
+# functions rebuilding the tables derived from the chips, in order of
+# registration
+_hooks = []
+
+_active = STANDARD
+
+
+def on_use(function):
+    """Decorator registering a function (without arguments) that rebuilds
+    module-level tables derived from the chips, or imports them anew from
+    the module building them. It is called once when registered and whenever
+    other chips are put to use."""
+    function()
+    _hooks.append(function)
+    return function
+
+
+def active():
+    """Returns the rule set whose chips are active."""
+    return _active
+
+
+def validate(rules):
+    """Raise a ValueError if the rule set cannot be played."""
+    from pyrummy.chips import Chip
+
+    if rules.decks < 1:
+        raise ValueError("At least one deck is required.")
+    if not 1 <= rules.colors <= len(Chip.COLOR_CODES):
+        raise ValueError("The number of colors must range from 1 to {}."
+                .format(len(Chip.COLOR_CODES)))
+    if rules.min_value < 1 or rules.max_value < rules.min_value:
+        raise ValueError("Invalid value range.")
+    if rules.players < 1 or rules.hand_size < 1:
+        raise ValueError("At least one player and one chip per hand are "
+                "required.")
+    nr_chips = rules.decks * rules.colors * (rules.max_value -
+            rules.min_value + 1)
+    if rules.players * rules.hand_size >= nr_chips:
+        raise ValueError("Not enough chips to deal the hands.")
+
+
+def chip_set(rules):
+    """Returns the fields of `rules` defining the chips."""
+    return (rules.decks, rules.colors, rules.min_value, rules.max_value)
+
+
+def use(rules):
+    """Make the chips of `rules` the active ones. If they differ from the
+    chips in use, all chips are created anew, hence chips, combinations,
+    pools and games of the previous rule set must not be used anymore."""
+    global _active
+    from pyrummy.chips import Chip
+
+    validate(rules)
+    chips = chip_set(rules)
+    if chips != chip_set(_active):
+        Chip.NR_DECKS, Chip.NR_COLORS, Chip.MIN_VALUE, Chip.MAX_VALUE = chips
+        Chip._instances.clear()
+        for hook in _hooks:
+            hook()
+    _active = rules
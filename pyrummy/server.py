@@ -0,0 +1,296 @@
+"""Asyncio host running many game tables concurrently in one process.
+A `Table` drives a `Game` turn by turn. Every seat is an async agent: a
+`BotSeat` lets the built-in `Player` play, a `RemoteSeat` asks a client
+connected via a stream (TCP or Unix socket) for its decision. A seat that does
+not answer within the per-turn `timeout`, answers with an invalid decision or
+disconnects is played by the built-in player for that turn, hence slow seats
+never stall their table for longer than the timeout, and never other tables.
+
+Protocol (one JSON object per line). For every turn of a remote seat, the
+server sends
+    {"type": "turn", "turn": T, "player": P, "hand": [ids],
+     "status": S, "yards": [[[ids]]], "positions": [[position]],
+     "threshold": X}
+where "yards" holds per player the chips of his combinations and "positions"
+their positions in the yards of the game (in order of publication),
+and the client replies with
+    {"turn": T, "publish": [[ids]], "lay_offs": [[id, position]],
+     "drop": id or null}
+laying off chips to the combinations at the given positions ("lay_offs" may
+be omitted).
+When the game is over, the server sends
+    {"type": "end", "winner": P, "turns": T, "outcome": O}
+with the `pyrummy.game.Game.outcome` O (P is null if there is no winner).
+Replies to past turns (f.i. after a timeout) are discarded."""
+
+import asyncio
+from collections import namedtuple
+import json
+import logging
+
+from pyrummy.chips import Chip, combination
+from pyrummy.game import Game, Player
+
+
+logger = logging.getLogger(__name__)
+
+# `winner` is None if the game was abandoned, `outcome` is the
+# `Game.outcome`. `timeouts` and `faults` count the turns of remote seats
+# that were played by the built-in player.
+TableResult = namedtuple("TableResult",
+        "seed winner turns timeouts faults outcome")
+
+# maximum length of a message line in bytes
+MESSAGE_LIMIT = 2**16
+
+
+class BotSeat(object):
+    """Seat taken by the built-in player."""
+
+    async def play(self, player, game):
+        player.play()
+
+    async def finish(self, game):
+        pass
+
+
+class RemoteSeat(object):
+    """Seat taken by a client connected via the given asyncio streams.
+    Writes wait for the transport to drain, hence a client not reading its
+    messages slows down its own turns only."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self.connected = True
+
+    async def _send(self, message):
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        await self._writer.drain()
+
+    async def play(self, player, game):
+        """Apply the client's decision to `player`. Raises ValueError for an
+        invalid decision and ConnectionError if the client disconnected."""
+        if not self.connected:
+            raise ConnectionError("Client disconnected.")
+        positions = [[] for _ in game._players]
+        for position, owner in enumerate(game._yards.owners):
+            positions[owner].append(position)
+        try:
+            await self._send({"type": "turn", "turn": game._turns,
+                "player": player._index,
+                "hand": [chip.id for chip in player._hand],
+                "status": player._status,
+                "yards": [[[chip.id for chip in c] for c in p._yard] for p in
+                    game._players],
+                "positions": positions,
+                "threshold": game.threshold})
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    raise ConnectionError("Client disconnected.")
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("Invalid message: {}".format(message))
+                if message.get("turn") == game._turns:
+                    break
+        except ConnectionError:
+            self.connected = False
+            raise
+        apply_decision(player, message.get("publish", []),
+                message.get("drop"), message.get("lay_offs", []))
+
+    async def finish(self, game):
+        if self.connected:
+            try:
+                await self._send({"type": "end", "winner": None if
+                    game._winner is None else game._winner._index,
+                    "turns": game._turns, "outcome": game.outcome})
+            except ConnectionError:
+                pass
+        self._writer.close()
+
+
+def _is_id(value):
+    # JSON true and false are decoded as bool, a subclass of int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def apply_decision(player, publish, drop, lay_offs=()):
+    """Publish the combinations of chip ids `publish` from the hand of
+    `player`, lay off the chips of the pairs of chip id and position in the
+    yards `lay_offs` in the given order, and designate the chip with id
+    `drop` for dropping. Only a player who published in an earlier turn may
+    lay off chips. Raises ValueError if the decision is malformed or breaks
+    the rules."""
+    if not isinstance(publish, list) or not all(isinstance(ids, list) and
+            all(_is_id(i) for i in ids) for ids in publish):
+        raise ValueError("Invalid combinations: {}".format(publish))
+    if not isinstance(lay_offs, (list, tuple)) or not all(
+            isinstance(pair, (list, tuple)) and len(pair) == 2 and
+            all(_is_id(i) for i in pair) for pair in lay_offs):
+        raise ValueError("Invalid lay-offs: {}".format(lay_offs))
+    if drop is not None and not _is_id(drop):
+        raise ValueError("Invalid chip to drop: {}".format(drop))
+    hand = player._hand.chips
+    used = set()
+    combinations = []
+    for ids in publish:
+        if len(ids) < 3 or not used.isdisjoint(ids) or len(set(ids)) != \
+                len(ids) or not all(i in hand for i in ids):
+            raise ValueError("Invalid combination: {}".format(ids))
+        used.update(ids)
+        chips = [hand[i] for i in ids]
+        colors = set(chip.color for chip in chips)
+        values = sorted(chip.value for chip in chips)
+        if len(set(values)) == 1:
+            if len(colors) != len(chips):
+                raise ValueError("Invalid book: {}".format(ids))
+        elif len(colors) != 1 or values != list(range(values[0],
+                values[0] + len(values))):
+            raise ValueError("Invalid run: {}".format(ids))
+        combinations.append(combination(*chips))
+
+    if combinations and player._status == Player.HAND_ONLY and sum(
+            c.value for c in combinations) < player.threshold:
+        raise ValueError("Combinations below threshold.")
+
+    if lay_offs:
+        if player._status == Player.HAND_ONLY or player._game is None:
+            raise ValueError("Chips can only be laid off after publishing.")
+        yards = player._game._yards
+        # the combinations as extended by the preceding lay-offs
+        extended = {}
+        for chip_id, position in lay_offs:
+            if chip_id not in hand or chip_id in used or not 0 <= position <\
+                    len(yards):
+                raise ValueError("Invalid lay-off: {}".format(
+                    [chip_id, position]))
+            chip = hand[chip_id]
+            combination_ = extended.get(position, yards[position])
+            if not combination_.accepts(chip):
+                raise ValueError("Invalid lay-off: {}".format(
+                    [chip_id, position]))
+            extended[position] = combination_.extended(chip)
+            used.add(chip_id)
+
+    if drop is None:
+        if len(used) != len(hand):
+            raise ValueError("No chip to drop.")
+    elif drop not in hand or drop in used:
+        raise ValueError("Invalid chip to drop: {}".format(drop))
+
+    if combinations:
+        player._publish(combinations)
+    for chip_id, position in lay_offs:
+        player._lay_off_chip(hand[chip_id], position)
+    player._drop_chip = None if drop is None else Chip.from_id(drop)
+
+
+class Table(object):
+    """A game and the seats of its players. If `seats` is not given, every
+    seat is taken by a bot. The game is abandoned without winner after
+    `max_turns`, s.t. a stalemate does not occupy the table forever.
+    Remaining keyword arguments are passed to the `Game`."""
+
+    def __init__(self, nr_players=4, seats=None, timeout=10.0, max_turns=1000,
+            **kwargs):
+        self.game = Game(nr_players, max_turns=max_turns, **kwargs)
+        self.seats = [BotSeat() for _ in range(nr_players)] if seats is None\
+                else list(seats)
+        if len(self.seats) != nr_players:
+            raise ValueError("Specify one seat per player.")
+        self.timeout = timeout
+        self.max_turns = max_turns
+        self.timeouts = 0
+        self.faults = 0
+
+    async def run(self):
+        """Play the game to its end and return a `TableResult`. The event
+        loop is yielded to once per turn."""
+        game = self.game
+        game.start()
+        try:
+            while True:
+                seat = self.seats[game._current_player_index]
+                player = game.begin_turn()
+                try:
+                    await asyncio.wait_for(seat.play(player, game),
+                            self.timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    player.play()
+                except (ValueError, ConnectionError) as e:
+                    logger.info("Seat %d: %s", player._index, e)
+                    self.faults += 1
+                    player.play()
+                if game.end_turn():
+                    break
+                await asyncio.sleep(0)
+        finally:
+            for seat in self.seats:
+                await seat.finish(game)
+        return TableResult(game._seed, None if game._winner is None else
+                game._winner._index, game._turns, self.timeouts, self.faults,
+                game.outcome)
+
+
+class Server(object):
+    """Hosts tables, at most `max_tables` of them at a time; further tables
+    wait until a table is finished. Every client connecting is seated at a
+    new table of `nr_players`, the other seats are taken by bots. Remaining
+    keyword arguments are passed to every `Table`."""
+
+    def __init__(self, max_tables=1000, nr_players=4, **kwargs):
+        self._slots = asyncio.Semaphore(max_tables)
+        self._nr_players = nr_players
+        self._kwargs = kwargs
+        self.results = []
+
+    async def play(self, table):
+        async with self._slots:
+            result = await table.run()
+        self.results.append(result)
+        return result
+
+    async def play_bots(self, seeds):
+        """Play a bot-only table for every seed concurrently. Returns the
+        results in order of the seeds."""
+        return await asyncio.gather(*[self.play(Table(self._nr_players,
+            seed=seed, **self._kwargs)) for seed in seeds])
+
+    async def handle_client(self, reader, writer):
+        seats = [RemoteSeat(reader, writer)] + [BotSeat() for _ in
+                range(self._nr_players - 1)]
+        await self.play(Table(self._nr_players, seats, **self._kwargs))
+
+    async def serve(self, host=None, port=None, path=None):
+        """Accept clients on the TCP `host` and `port`, or on the Unix socket
+        at `path`. Returns the `asyncio.Server`."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path,
+                    limit=MESSAGE_LIMIT)
+        return await asyncio.start_server(self.handle_client, host, port,
+                limit=MESSAGE_LIMIT)
+
+
+async def bot_client(reader, writer, engine=None):
+    """Client playing every turn with a built-in player using `engine`, until
+    the game is over. Returns the end message."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return None
+        message = json.loads(line)
+        if message["type"] == "end":
+            writer.close()
+            return message
+        player = Player(message["player"], [Chip.from_id(i) for i in
+            message["hand"]], engine=engine, threshold=message["threshold"])
+        player._status = message["status"]
+        player.play()
+        writer.write(json.dumps({"turn": message["turn"],
+            "publish": [[chip.id for chip in c] for c in player._yard],
+            "drop": None if player._drop_chip is None else
+                player._drop_chip.id}).encode() + b"\n")
+        await writer.drain()
@@ -0,0 +1,136 @@
+"""Exact search for the optimal partition of a hand into combinations.
+The hand is reduced to a canonical key holding the number of chips per code
+(i.e. per color and value, ignoring the chip index). The lowest chip of a key
+is either left over, or it is the lowest chip of a `Run`, or it is part of a
+`Book` with chips of the same value and higher color index. Recursing over
+these options yields the best partition; sub-keys are memoized s.t. repeated
+sub-hands (within a hand as well as across turns) are solved only once."""
+
+from functools import lru_cache
+
+from pyrummy.chips import Chip, combination
+from pyrummy.game import _Constellation
+from pyrummy.hand import Hand
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global NR_CODES
+    NR_CODES = (Chip.MAX_VALUE - Chip.MIN_VALUE + 1) * Chip.NR_COLORS
+
+
+def hand_key(chips):
+    """Canonical key of a collection of chips: a tuple holding the number of
+    chips per code (see `Chip.code_index`)."""
+    if isinstance(chips, Hand):
+        return tuple(chips.counts)
+    key = [0] * NR_CODES
+    for chip in chips:
+        key[chip.code_index] += 1
+    return tuple(key)
+
+
+def _value(code):
+    return code // Chip.NR_COLORS + Chip.MIN_VALUE
+
+
+class OptimalEngine(object):
+    """Search strategy returning the optimal constellation of a hand.
+    Combinations are ranked by `objective`, one of "size" (maximum number of
+    chips, ties broken by value) or "value" (maximum value, ties broken by
+    number of chips). A partition of maximum size may fall short of the
+    publishing threshold while a smaller one reaches it, hence with "size"
+    the partition of maximum value is returned, too (if it differs). At most
+    `cache_size` sub-hands per objective are memoized (least recently used
+    are discarded first)."""
+
+    OBJECTIVES = ("size", "value")
+
+    def __init__(self, objective="size", cache_size=2**16):
+        if objective not in OptimalEngine.OBJECTIVES:
+            raise ValueError("Unknown objective '{}'.".format(objective))
+        self._by_value = objective == "value"
+        self._solve = lru_cache(maxsize=cache_size)(self._solve_key)
+
+    def cache_info(self):
+        return self._solve.cache_info()
+
+    @staticmethod
+    def _better(first, second, by_value):
+        """Compare two (size, value) scores, by value first if `by_value`."""
+        if by_value:
+            return (first[1], first[0]) > (second[1], second[0])
+        return first > second
+
+    def _solve_key(self, key, by_value):
+        """Returns the best score as (size, value) tuple and the combinations
+        as tuple of code tuples for the given hand key, ranked by value
+        first if `by_value`."""
+        for lowest, count in enumerate(key):
+            if count:
+                break
+        else:
+            return (0, 0), ()
+
+        counts = list(key)
+        counts[lowest] -= 1
+
+        # lowest chip left over
+        best_score, best_melds = self._solve(tuple(counts), by_value)
+
+        def consider(codes, remaining):
+            nonlocal best_score, best_melds
+            score, melds = self._solve(tuple(remaining), by_value)
+            value = sum(_value(c) for c in codes)
+            score = (score[0] + len(codes), score[1] + value)
+            if self._better(score, best_score, by_value):
+                best_score, best_melds = score, (tuple(codes),) + melds
+
+        # runs starting with the lowest chip
+        run = [lowest]
+        remaining = counts[:]
+        code = lowest + Chip.NR_COLORS
+        while code < NR_CODES and remaining[code]:
+            remaining[code] -= 1
+            run.append(code)
+            if len(run) >= 3:
+                consider(run, remaining)
+            code += Chip.NR_COLORS
+
+        # books of the lowest chip's value with higher colors
+        next_value = lowest - lowest % Chip.NR_COLORS + Chip.NR_COLORS
+        others = [c for c in range(lowest + 1, next_value)
+                if counts[c]]
+        for i, second in enumerate(others):
+            for j, third in enumerate(others[i + 1:], i + 1):
+                remaining = counts[:]
+                remaining[second] -= 1
+                remaining[third] -= 1
+                consider([lowest, second, third], remaining)
+                for fourth in others[j + 1:]:
+                    remaining[fourth] -= 1
+                    consider([lowest, second, third, fourth], remaining)
+                    remaining[fourth] += 1
+
+        return best_score, best_melds
+
+    def constellations(self, hand):
+        """Returns a list holding the optimal `_Constellation` of `hand`,
+        followed by the one of maximum value if the objective is "size" and
+        it differs."""
+        key = hand_key(hand)
+        objectives = (True,) if self._by_value else (False, True)
+        constellations = {}
+        for by_value in objectives:
+            chips = {}
+            for chip in sorted(hand, key=lambda c: c.id, reverse=True):
+                chips.setdefault(chip.code_index, []).append(chip)
+
+            _, melds = self._solve(key, by_value)
+
+            combinations = [combination(*[chips[code].pop() for code in
+                codes]) for codes in melds]
+            constellations.setdefault(_Constellation(combinations, [chip for
+                code in sorted(chips, reverse=True) for chip in chips[code]]))
+        return list(constellations)
@@ -0,0 +1,32 @@
+"""Undo log to take and restore snapshots of a game in O(changes)."""
+
+from collections import namedtuple
+
+
+Snapshot = namedtuple("Snapshot", "length current_player_index winner turns "
+        "outcome idle_turns drawn hand_size random_states players")
+Snapshot.__doc__ = """State of a game at the time of `Game.snapshot()`:
+the length of the journal, the scalar attributes of the game and, per player,
+the tuple of status, publish turn and drop chip. Hands, yards and the pool are
+restored from the journal."""
+
+
+class Journal(object):
+    """Undo log of a game. Every modification of a hand, yard, pool or
+    knowledge records a function (and its arguments) that reverts it. Rolling
+    back to an earlier length calls these functions in reverse order."""
+
+    def __init__(self):
+        self._undo = []
+
+    def __len__(self):
+        return len(self._undo)
+
+    def record(self, function, *args):
+        self._undo.append((function, args))
+
+    def rollback(self, length):
+        undo = self._undo
+        while len(undo) > length:
+            function, args = undo.pop()
+            function(*args)
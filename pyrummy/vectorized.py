@@ -0,0 +1,99 @@
+"""Vectorized evaluation of many hands at once (requires NumPy).
+A batch of hands is encoded as tensor of shape (batch, colors, values) holding
+the number of chips per code. Runs are detected by convolving the presence of
+chips along the value axis with a window of three (every window fully present
+starts a run of at least three chips), books by counting the colors present per
+value. Every chip is used by at most one combination, and all combinations
+follow the rules of `pyrummy.chips.Run` and `pyrummy.chips.Book`.
+
+The decomposition is evaluated twice, extracting runs before books and vice
+versa, and the better one is kept. The resulting meld value is hence a lower
+bound of the optimum found by `pyrummy.solver.OptimalEngine(objective="value")`
+and equal to it unless combinations compete for chips in complex ways."""
+
+from collections import namedtuple
+
+import numpy as np
+
+from pyrummy.chips import Chip
+from pyrummy.game import Game
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global NR_VALUES, VALUES
+    NR_VALUES = Chip.MAX_VALUE - Chip.MIN_VALUE + 1
+    VALUES = np.arange(Chip.MIN_VALUE, Chip.MAX_VALUE + 1)
+
+
+Evaluation = namedtuple("Evaluation", "meld_value rest_value can_publish")
+
+
+def encode(hands):
+    """Encode a sequence of hands (iterables of chips) as count tensor of shape
+    (len(hands), Chip.NR_COLORS, NR_VALUES)."""
+    counts = np.zeros((len(hands), Chip.NR_COLORS, NR_VALUES), dtype=np.int8)
+    for i, hand in enumerate(hands):
+        for chip in hand:
+            counts[i, chip.color, chip.value - Chip.MIN_VALUE] += 1
+    return counts
+
+
+def extract_runs(counts):
+    """Remove runs of at least three chips from `counts` (modified in place)
+    and return the mask of chips removed per copy, shape (copies, ...)."""
+    removed = []
+    for _ in range(Chip.NR_DECKS):
+        present = counts > 0
+        # windows of three adjacent values that are fully present
+        windows = present[..., :-2] & present[..., 1:-1] & present[..., 2:]
+        covered = np.zeros_like(present)
+        covered[..., :-2] |= windows
+        covered[..., 1:-1] |= windows
+        covered[..., 2:] |= windows
+        counts -= covered
+        removed.append(covered)
+    return np.stack(removed)
+
+
+def extract_books(counts):
+    """Remove books of three or four colors from `counts` (modified in place)
+    and return the mask of chips removed per copy, shape (copies, ...)."""
+    removed = []
+    for _ in range(Chip.NR_DECKS):
+        present = counts > 0
+        books = present.sum(axis=-2, keepdims=True) >= 3
+        covered = present & books
+        counts -= covered
+        removed.append(covered)
+    return np.stack(removed)
+
+
+def hand_values(counts):
+    """Total value of the chips per hand."""
+    return (counts * VALUES).sum(axis=(-2, -1))
+
+
+def evaluate(counts, threshold=None):
+    """Evaluate a count tensor (see `encode`). Returns an `Evaluation` of
+    arrays of length batch: the value of the best combinations found, the value
+    of the remaining chips and whether the combinations reach `threshold`
+    (default: `Game.THRESHOLD`)."""
+    if threshold is None:
+        threshold = Game.THRESHOLD
+
+    counts = np.asarray(counts, dtype=np.int16)
+    total = hand_values(counts)
+
+    runs_first = counts.copy()
+    extract_runs(runs_first)
+    extract_books(runs_first)
+
+    books_first = counts.copy()
+    extract_books(books_first)
+    extract_runs(books_first)
+
+    rest_value = np.minimum(hand_values(runs_first), hand_values(books_first))
+    meld_value = total - rest_value
+    return Evaluation(meld_value, rest_value, meld_value >= threshold)
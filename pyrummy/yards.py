@@ -0,0 +1,69 @@
+"""Combinations published to the yards of all players."""
+
+from pyrummy.chips import Chip
+from pyrummy.rules import on_use
+
+
+@on_use
+def _configure():
+    global NR_CODES
+    from pyrummy.hand import NR_CODES
+
+
+class Yards(list):
+    """List of the combinations published by all players, in order of
+    publishing, with `owners` holding the index of the publishing player per
+    combination. An index maps every chip code to the positions of the
+    combinations accepting a chip of that code, s.t. finding a combination to
+    lay off a chip costs O(1), no matter how many combinations are published.
+    The index is updated when a combination is published or replaced by its
+    extension, hence the yards must only be modified via `publish` and
+    `lay_off`.
+    If a `journal` (see `pyrummy.state.Journal`) is set, every modification is
+    recorded to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.journal = None
+        self.owners = []
+        self._accepting = [set() for _ in range(NR_CODES)]
+
+    def publish(self, owner, combination):
+        self.append(combination)
+        self.owners.append(owner)
+        self._index(len(self) - 1, True)
+        if self.journal is not None:
+            self.journal.record(self._unpublish)
+
+    def accepting(self, chip):
+        """Returns the position of the first combination the chip can be laid
+        off to, or None."""
+        positions = self._accepting[chip.code_index]
+        return min(positions) if positions else None
+
+    def lay_off(self, position, chip):
+        """Replace the combination at `position`, which must accept the chip,
+        by the combination extended by the chip. Returns the latter."""
+        combination = self[position]
+        self._replace(position, combination.extended(chip))
+        if self.journal is not None:
+            self.journal.record(self._replace, position, combination)
+        return self[position]
+
+    def _unpublish(self):
+        self._index(len(self) - 1, False)
+        self.pop()
+        self.owners.pop()
+
+    def _replace(self, position, combination):
+        self._index(position, False)
+        self[position] = combination
+        self._index(position, True)
+
+    def _index(self, position, add):
+        for code in set(i // Chip.NR_DECKS for i in
+                self[position].candidate_ids()):
+            if add:
+                self._accepting[code].add(position)
+            else:
+                self._accepting[code].discard(position)
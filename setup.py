@@ -11,7 +11,14 @@ setup(
         #classifiers=[],
         packages=find_packages(exclude=["test", "doc"]),
         entry_points = {
-            "console_scripts": ["pyrummy = pyrummy.game:main"]
+            "console_scripts": [
+                "pyrummy = pyrummy.game:main",
+                "pyrummy-batch = pyrummy.batch:main",
+                "pyrummy-dataset = pyrummy.dataset:main",
+                ]
             },
-        install_requires=[]
+        install_requires=[],
+        extras_require={
+            "numpy": ["numpy"],
+            }
         )
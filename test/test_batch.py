@@ -0,0 +1,86 @@
+import unittest
+
+from pyrummy.game import Game
+from pyrummy.bitset import BitsetEngine
+from pyrummy.batch import GameResult, Statistics, play_game, simulate
+
+
+class PlayGameTestCase(unittest.TestCase):
+    def test_reproducible(self):
+        self.assertEqual(play_game(3), play_game(3))
+
+    def test_bounded(self):
+        result = play_game(5, max_turns=3)
+        self.assertEqual((None, 3, Game.MAX_TURNS), (result.winner,
+            result.turns, result.outcome))
+
+    def test_result(self):
+        result = play_game(5, nr_players=3)
+        self.assertEqual(5, result.seed)
+        self.assertEqual(3, len(result.hand_values))
+        self.assertEqual(0, result.hand_values[result.winner])
+        self.assertIsNotNone(result.publish_turns[result.winner])
+
+
+class StatisticsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.results = [
+                GameResult(0, 1, 20, (None, 8), (30, 0), Game.WON),
+                GameResult(1, 0, 30, (12, 14), (0, 5), Game.WON),
+                GameResult(2, 0, 40, (13, None), (0, 60), Game.WON),
+                ]
+
+    def test_add(self):
+        statistics = Statistics(2)
+        for result in self.results:
+            statistics.add(result)
+        self.assertEqual(3, statistics.nr_games)
+        self.assertListEqual([2, 1], statistics.wins)
+        self.assertDictEqual({Game.WON: 3}, statistics.outcomes)
+        self.assertEqual(30, statistics.mean_turns)
+        self.assertEqual((20, 40), (statistics.min_turns, statistics.max_turns))
+        self.assertListEqual([12.5, 11], statistics.mean_publish_turns)
+        self.assertListEqual([10, 65 / 3], statistics.mean_hand_values)
+
+    def test_merge(self):
+        first, second, total = Statistics(2), Statistics(2), Statistics(2)
+        for i, result in enumerate(self.results):
+            (first if i else second).add(result)
+            total.add(result)
+        first.merge(second)
+        self.assertDictEqual(total.as_dict(), first.as_dict())
+
+    def test_empty(self):
+        statistics = simulate(0, processes=1)
+        self.assertEqual(0, statistics.nr_games)
+        self.assertEqual({"mean": None, "std": None, "min": None, "max": None},
+                statistics.as_dict()["turns"])
+        self.assertIsNone(statistics.as_dict()["mean_hand_values"])
+        self.assertEqual(4 * [None], statistics.mean_publish_turns)
+
+    def test_merge_mismatch(self):
+        self.assertRaises(ValueError, Statistics(2).merge, Statistics(3))
+
+
+class SimulateTestCase(unittest.TestCase):
+    def test_single_process(self):
+        statistics = simulate(4, nr_players=2, processes=1)
+        self.assertEqual(4, statistics.nr_games)
+        self.assertEqual(4, sum(statistics.wins))
+        self.assertDictEqual({Game.WON: 4}, statistics.outcomes)
+
+    def test_bounded(self):
+        statistics = simulate(20, processes=1, max_turns=40)
+        self.assertEqual(40, statistics.max_turns)
+        self.assertEqual(20, sum(statistics.outcomes.values()))
+        self.assertEqual(sum(statistics.wins), statistics.outcomes[Game.WON])
+        self.assertIn(Game.MAX_TURNS, statistics.outcomes)
+
+    def test_processes(self):
+        parallel = simulate(6, seed=10, processes=2, engine_class=BitsetEngine,
+                chunksize=2)
+        serial = simulate(6, seed=10, processes=1, engine_class=BitsetEngine)
+        self.assertDictEqual(serial.as_dict(), parallel.as_dict())
+
+if __name__ == "__main__":
+    unittest.main()
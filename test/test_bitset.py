@@ -0,0 +1,74 @@
+import random
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import GreedyEngine, Player, Pool
+from pyrummy.bitset import BitsetEngine, iter_ids, popcount
+
+
+class BitsetHelpersTestCase(unittest.TestCase):
+    def test_iter_ids(self):
+        self.assertListEqual(list(iter_ids(0b10110)), [4, 2, 1])
+
+    def test_popcount(self):
+        self.assertEqual(popcount(0b10110), 3)
+        self.assertEqual(popcount(0), 0)
+
+
+class BitsetEngineTestCase(unittest.TestCase):
+    def test_book(self):
+        hand = Chip.chips_from_str("b8", "b7", "r7", "y7")
+        constellations = BitsetEngine().constellations(hand)
+        best = max(constellations, key=lambda c: c.value)
+        self.assertEqual(21, best.value)
+        self.assertEqual(3, best.size)
+        self.assertListEqual(best.rest, [Chip.from_str("b8")])
+
+    def test_run(self):
+        hand = Chip.chips_from_str("k13", "k12", "k11", "k9")
+        constellations = BitsetEngine().constellations(hand)
+        best = max(constellations, key=lambda c: c.value)
+        self.assertEqual(36, best.value)
+        self.assertEqual(1, len(best.combinations))
+        self.assertListEqual([c.value for c in best.combinations[0]],
+                [11, 12, 13])
+
+    def test_no_combination(self):
+        hand = Chip.chips_from_str("k13", "y12", "r1")
+        constellations = BitsetEngine().constellations(hand)
+        self.assertTrue(all(c.value == 0 for c in constellations))
+        self.assertEqual(1, len(constellations))
+
+    def test_player_double_chip(self):
+        player = Player(0, [
+            Chip.from_str("y2", index=0), Chip.from_str("y3"), Chip.from_str("y4"),
+            Chip.from_str("y2", index=1), Chip.from_str("r2"), Chip.from_str("k2")],
+            engine=BitsetEngine(), threshold=10)
+        player.play()
+        self.assertEqual(2, len(player._yard))
+        self.assertEqual(0, len(player._hand))
+        self.assertIsNone(player.drop())
+
+    def test_player_drop(self):
+        chips = [Chip.from_str("r9"), Chip.from_str("y9"),
+                Chip.from_str("k5"), Chip.from_str("k4")]
+        player = Player(0, chips, engine=BitsetEngine())
+        player.play()
+        self.assertEqual(player.drop(), Chip.from_str("k4"))
+        self.assertEqual(3, len(player._hand))
+
+    def test_greedy_equivalence(self):
+        def codes(constellations):
+            return [(sorted(sorted(chip.code_index for chip in combination)
+                for combination in c.combinations),
+                [chip.code_index for chip in c.rest]) for c in constellations]
+
+        rng = random.Random(0)
+        chips = list(Pool())
+        for _ in range(200):
+            hand = rng.sample(chips, rng.randint(14, 20))
+            self.assertEqual(codes(GreedyEngine().constellations(hand)),
+                    codes(BitsetEngine().constellations(hand)))
+
+if __name__ == "__main__":
+    unittest.main()
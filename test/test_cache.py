@@ -0,0 +1,94 @@
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Player
+from pyrummy.cache import Decision, DecisionCache
+from pyrummy.batch import simulate
+from pyrummy.drop import DropSelector
+
+
+class DecisionCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = DecisionCache(maxsize=2)
+        cache.put("a", Decision((), (1,)))
+        cache.put("b", Decision((), (2,)))
+        self.assertEqual((1,), cache.get("a").rest)
+        cache.put("c", Decision((), (3,)))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((3,), cache.get("c").rest)
+        self.assertEqual((2, 1, 2, 2), tuple(cache.info()))
+
+    def test_clear(self):
+        cache = DecisionCache()
+        cache.put("a", Decision((), ()))
+        cache.get("a")
+        cache.clear()
+        self.assertEqual((0, 0, 0), (cache.hits, cache.misses,
+            cache.info().currsize))
+
+
+class PlayerCacheTestCase(unittest.TestCase):
+    def test_replay(self):
+        cache = DecisionCache()
+        players = []
+        for index in range(2):
+            player = Player(0, [Chip.from_str(code, index=index) for code in
+                ("r9", "r8", "r7", "b7", "y7", "k7", "k1")], cache=cache,
+                threshold=20)
+            player.play()
+            players.append(player)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        first, second = players
+        self.assertEqual(first._status, second._status)
+        self.assertEqual([sorted(c.code for c in combination) for combination
+            in first._yard], [sorted(c.code for c in combination) for
+                combination in second._yard])
+        self.assertEqual(first.drop().code, second.drop().code)
+        self.assertTrue(all(chip.id % 2 == 1 for combination in second._yard
+            for chip in combination))
+
+    def test_knowledge(self):
+        class Recorder(DropSelector):
+            def select(self, chips, degrees, rng, outs=None):
+                calls.append(sorted(zip((c.code for c in chips), outs)))
+                return super().select(chips, degrees, rng, outs)
+
+        calls = []
+        cache = DecisionCache()
+        for index in range(2):
+            player = Player(0, [Chip.from_str(code, index=index) for code in
+                ("r9", "r8", "r7", "k1", "y5")], cache=cache,
+                drop_selector=Recorder(), threshold=20)
+            if index:
+                player._knowledge.see(Chip.from_str("k2"))
+            player.play()
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+        # the drop is selected anew with the outs of the second player
+        self.assertEqual(2, len(calls))
+        self.assertEqual([("k01", 10), ("y05", 14)], calls[0])
+        self.assertEqual([("k01", 9), ("y05", 14)], calls[1])
+
+    def test_status(self):
+        cache = DecisionCache()
+        for status in (Player.HAND_ONLY, Player.PUBLISHED):
+            player = Player(0, Chip.chips_from_str("r1", "r2", "r3"),
+                    cache=cache)
+            player._status = status
+            player.play()
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(1, len(player._yard))
+
+
+class SimulateCacheTestCase(unittest.TestCase):
+    def test_simulate(self):
+        statistics = simulate(3, nr_players=2, processes=1, cache_size=1000)
+        self.assertEqual(3, statistics.nr_games)
+
+    def test_reproducible(self):
+        # the cache must not change the course of the games
+        self.assertEqual(vars(simulate(40, 2, processes=1)),
+                vars(simulate(40, 2, processes=1, cache_size=10000)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
+import pickle
 import unittest
-from collections import deque
 
 from pyrummy.chips import Chip, Book, Run
 
@@ -7,14 +7,32 @@ from pyrummy.chips import Chip, Book, Run
 class ChipTestCase(unittest.TestCase):
 
     def test_init(self):
-        chip = Chip(Chip.RED, 1, Chip.YARDS, 1)
-        self.assertEqual(hash(chip), 1953)
-        self.assertEqual(chip.location, Chip.YARDS)
+        chip = Chip(Chip.RED, 1, index=1)
+        self.assertEqual(hash(chip), 3)
 
     def test_from_str(self):
         chip = Chip.from_str("b10")
-        self.assertEqual(hash(chip), 842)
-        self.assertEqual(chip.location, Chip.POOL)
+        self.assertEqual(hash(chip), 76)
+
+    def test_from_id(self):
+        for chip_id in (0, 3, 76, 103):
+            self.assertEqual(chip_id, Chip.from_id(chip_id).id)
+
+    def test_interned(self):
+        chip = Chip(Chip.BLUE, 6, index=1)
+        self.assertIs(chip, Chip.from_str("b6", index=1))
+        self.assertIsNot(chip, Chip.from_str("b6", index=0))
+        self.assertIs(chip, pickle.loads(pickle.dumps(chip)))
+        self.assertFalse(hasattr(chip, "__dict__"))
+
+    def test_location(self):
+        # chips are shared by all games, hence they have no location
+        with self.assertWarns(DeprecationWarning):
+            chip = Chip.from_str("k3", location=2)
+        with self.assertWarns(DeprecationWarning):
+            self.assertIsNone(chip.location)
+        with self.assertWarns(DeprecationWarning):
+            chip.location = Chip.POOL
 
     def test_code(self):
         chip = Chip.from_str("y1")
@@ -32,6 +50,14 @@ class ChipTestCase(unittest.TestCase):
         self.assertSetEqual(set(chip.candidates()),
                 {"y02", "b02", "k02", "r03", "r01"})
 
+    def test_candidate_ids(self):
+        chip = Chip.from_str("r1")
+        self.assertSetEqual(set(chip.candidate_ids()),
+                {c.id for code in chip.candidates() for c in
+                    [Chip.from_str(code, index=i) for i in range(Chip.NR_DECKS)]})
+        # precomputed, no allocation per call
+        self.assertIs(chip.candidates(), Chip.from_str("r1", index=1).candidates())
+
     def test_remote_candidates(self):
         self.assertTrue(Chip.remote_candidates(Chip.from_str("r2"), Chip.from_str("r4")))
         self.assertTrue(Chip.remote_candidates(Chip.from_str("r4"), Chip.from_str("r3")))
@@ -52,6 +78,8 @@ class BookTestCase(unittest.TestCase):
         candidates = set(book.candidates())
         self.assertSetEqual(candidates, {"r11", "b11"})
         self.assertEqual(book.value, 22)
+        self.assertIn(Chip.from_str("b11", index=1).id, book.candidate_ids())
+        self.assertNotIn(Chip.from_str("y11").id, book.candidate_ids())
 
     def test_four_chip_book(self):
         book = Book(*[Chip(color, 4) for color in range(Chip.NR_COLORS)])
@@ -61,17 +89,55 @@ class BookTestCase(unittest.TestCase):
 class RunTestCase(unittest.TestCase):
     def test_init_sort(self):
         run = Run(Chip.from_str("r9"), Chip.from_str("r8"), Chip.from_str("r10"))
-        self.assertEqual(run, deque([Chip.from_str("r8"), Chip.from_str("r9"),
-            Chip.from_str("r10")]))
+        self.assertEqual(list(run), [Chip.from_str("r8"),
+            Chip.from_str("r9"), Chip.from_str("r10")])
 
     def test_candidates(self):
         run = Run(Chip.from_str("r9"), Chip.from_str("r8"), Chip.from_str("r10"))
         candidates = list(run.candidates())
         self.assertListEqual(candidates, ["r11", "r07"])
+        self.assertSetEqual(set(run.candidate_ids()), {Chip.from_str(c, index=i).id
+            for c in candidates for i in range(Chip.NR_DECKS)})
 
     def test_no_candidates(self):
         run = Run(*[Chip(Chip.BLACK, v) for v in range(Chip.MAX_VALUE, 0, -1)])
         self.assertEqual(0, len(list(run.candidates())))
 
+    def test_extended(self):
+        run = Run(*Chip.chips_from_str("r8", "r9", "r10"))
+        longer = run.extended(Chip.from_str("r7")).extended(
+                Chip.from_str("r11"))
+        self.assertEqual(3, len(run))
+        self.assertEqual([7, 8, 9, 10, 11], [c.value for c in longer])
+        self.assertEqual((7, 11, Chip.RED), (longer.low, longer.high,
+            longer.color))
+        self.assertEqual(45, longer.value)
+        self.assertEqual(["r12", "r06"], list(longer.candidates()))
+        self.assertEqual(Run(*Chip.chips_from_str("r11", "r10", "r9", "r8",
+            "r7")), longer)
+
+
+class CombinationTestCase(unittest.TestCase):
+    def test_hash(self):
+        book = Book(*Chip.chips_from_str("r5", "y5", "k5"))
+        same = Book(*Chip.chips_from_str("k5", "r5", "y5"))
+        other = Book(Chip.from_str("r5", index=1), *Chip.chips_from_str("y5",
+            "k5"))
+        self.assertEqual(book, same)
+        self.assertEqual(hash(book), hash(same))
+        self.assertNotEqual(book, other)
+        self.assertEqual(2, len({book, same, other}))
+
+    def test_immutable(self):
+        book = Book(*Chip.chips_from_str("r5", "y5", "k5"))
+        for name in ("foo", "value", "mask"):
+            with self.assertRaises(AttributeError):
+                setattr(book, name, 1)
+        extended = book.extended(Chip.from_str("b5"))
+        self.assertEqual((3, 4), (len(book), len(extended)))
+        self.assertTrue(book.accepts(Chip.from_str("b5")))
+        self.assertFalse(extended.accepts(Chip.from_str("b5")))
+        self.assertEqual(20, extended.value)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyrummy.game import Game, Player
+from pyrummy import events
+
+try:
+    import numpy as np
+    from pyrummy.dataset import DatasetWriter, export, load
+    from pyrummy.vectorized import encode
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class DatasetTestCase(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_hands(self):
+        # small chunks, s.t. they are flushed within a game
+        writer = DatasetWriter(self.path, chunk_size=16)
+        hands = []
+        games = [Game(4, seed=seed) for seed in range(2)]
+        for game in games:
+            def trace(event, game=game):
+                writer(event)
+                if isinstance(event, events.Draw):
+                    hands.append(encode([game._players[event.player]._hand])[0])
+            game._trace = trace
+            game.run()
+        writer.close()
+
+        data = load(self.path)
+        self.assertIsInstance(data["hand"], np.memmap)
+        turns = sum(game._turns for game in games)
+        self.assertEqual((turns, 4, 13), data["hand"].shape)
+        self.assertTrue(np.array_equal(np.array(hands), data["hand"]))
+        self.assertListEqual([0, 1], data["game_seed"].tolist())
+        self.assertListEqual([game._winner._index for game in games],
+                data["game_winner"].tolist())
+        self.assertListEqual([game._turns for game in games],
+                data["game_turns"].tolist())
+        self.assertListEqual([0, 0], data["game_outcome"].tolist())
+        self.assertListEqual([0, 1], np.unique(data["game"]).tolist())
+
+        # the first player draws from the pool of all other chips
+        self.assertEqual(104 - 4 * 14 - 1, data["pool"][0])
+        published = data["melds"].sum(axis=(1, 2)) > 0
+        for game in games:
+            yard_chips = sum(len(c) for p in game._players for c in p._yard)
+            rows = data["game"] == games.index(game)
+            self.assertEqual(yard_chips, data["melds"][rows].sum() +
+                    data["lay_offs"][rows].sum())
+        # players are published from the turn after their first publication
+        for game in range(2):
+            for player in range(4):
+                rows = np.flatnonzero((data["game"] == game) &
+                        (data["player"] == player))
+                first = np.argmax(published[rows])
+                self.assertTrue(np.all(data["status"][rows[:first + 1]] ==
+                    Player.HAND_ONLY))
+                self.assertTrue(np.all(data["status"][rows[first + 1:]] ==
+                    Player.PUBLISHED))
+        self.assertTrue(np.all(data["drop"][:-1] >= 0))
+
+    def test_export(self):
+        export(self.path, 3, nr_players=2, seed=5, chunk_size=1000)
+        data = load(self.path)
+        self.assertEqual(len(data["turn"]), data["game_turns"].sum())
+        self.assertTrue(np.all(data["player"] < 2))
+        self.assertSetEqual({"game", "turn", "player", "hand", "yards",
+            "pool", "status", "melds", "lay_offs", "drop", "game_seed",
+            "game_winner", "game_turns", "game_outcome"}, set(data))
+        self.assertEqual(14, len(os.listdir(self.path)))
+
+    def test_outcome(self):
+        with DatasetWriter(self.path) as writer:
+            Game(4, seed=1, trace=writer, max_turns=5).run()
+            game = Game(4, seed=2, trace=writer)
+            game.start()
+            game.turn()
+        data = load(self.path)
+        self.assertListEqual([-1, -1], data["game_winner"].tolist())
+        self.assertListEqual([5, 1], data["game_turns"].tolist())
+        self.assertListEqual([Game.OUTCOMES.index(Game.MAX_TURNS), -1],
+                data["game_outcome"].tolist())
+
+if __name__ == "__main__":
+    unittest.main()
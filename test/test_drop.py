@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.hand import Hand
+from pyrummy.drop import DropSelector
+
+
+def select(selector, codes, outs=None):
+    chips = Chip.chips_from_str(*codes)
+    hand = Hand(chips)
+    return selector.select(chips, hand.degrees(chips), random.Random(0), outs)
+
+
+class DropSelectorTestCase(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(DropSelector().select([], [], random.Random(0)))
+
+    def test_unmatched(self):
+        self.assertEqual(Chip.from_str("k5"),
+                select(DropSelector(), ["r9", "r8", "k5"]))
+
+    def test_all_matched(self):
+        self.assertEqual(Chip.from_str("k4"),
+                select(DropSelector(), ["r9", "y9", "k5", "k4"]))
+
+    def test_match(self):
+        # r4 has to be paired with r2 (its only candidate), s.t. r5/r6 and
+        # y6/k6 remain pairs
+        chips = Chip.chips_from_str("r2", "r4", "r5", "r6", "y6", "k6")
+        hand = Hand(chips)
+        matched = DropSelector().match(chips, hand.degrees(chips))
+        self.assertEqual(6, len(matched))
+
+    def test_prefer_low_degree(self):
+        # r9 and y9 are candidates of k9 only; one of them stays unmatched
+        # whereas b1 has no remote candidate at all
+        self.assertEqual(Chip.from_str("b1"),
+                select(DropSelector(), ["k9", "r9", "y9", "b1"]))
+
+    def test_outs(self):
+        # b1 and k5 are unmatched without candidates; k5 has no outs left and
+        # is more likely dropped, but b1 is not ruled out
+        chips = Chip.chips_from_str("r9", "r8", "b1", "k5")
+        degrees = Hand(chips).degrees(chips)
+        dropped = [DropSelector().select(chips, degrees, random.Random(i),
+            [9, 9, 6, 0]) for i in range(100)]
+        self.assertEqual({Chip.from_str("b1"), Chip.from_str("k5")},
+                set(dropped))
+        self.assertGreater(dropped.count(Chip.from_str("k5")), 70)
+        # the outs only break ties of the score
+        self.assertEqual(Chip.from_str("k4"),
+                select(DropSelector(), ["r9", "y9", "k5", "k4"], [8, 3, 9, 9]))
+
+    def test_score(self):
+        def highest_first(chip, degree, matched):
+            return -chip.value
+        self.assertEqual(Chip.from_str("r9"),
+                select(DropSelector(highest_first), ["r9", "y8", "k5", "k4"]))
+
+if __name__ == "__main__":
+    unittest.main()
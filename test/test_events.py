@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Game, Pool
+from pyrummy import events
+from pyrummy.rules import STANDARD
+
+
+class EventsTestCase(unittest.TestCase):
+    def test_as_dict(self):
+        self.assertDictEqual(events.as_dict(events.Win(3, 1)),
+                {"event": "Win", "turn": 3, "player": 1})
+
+    def test_memory_sink_maxlen(self):
+        sink = events.MemorySink(maxlen=2)
+        for turn in range(3):
+            sink(events.Win(turn, 0))
+        self.assertListEqual([1, 2], [e.turn for e in sink])
+
+
+class GameTraceTestCase(unittest.TestCase):
+    def test_two_simple_players(self):
+        hands = [Chip.chips_from_str("r11", "y5", "k2"),
+                Chip.chips_from_str("k9", "r9", "b1")]
+        pool = Pool([Chip.from_str("y9", index=i) for i in range(2)])
+        sink = events.MemorySink()
+        game = Game(pool=pool, hands=hands, trace=sink,
+                rules=STANDARD._replace(players=2, threshold=25))
+        game.run()
+
+        start = sink[0]
+        self.assertIsInstance(start, events.GameStart)
+        self.assertEqual(2, len(start.hands))
+        draws = sink.of_type(events.Draw)
+        self.assertListEqual([e.turn for e in draws],
+                list(range(1, len(draws) + 1)))
+        publish, = sink.of_type(events.Publish)
+        self.assertEqual((draws[-1].turn, 1), (publish.turn, publish.player))
+        self.assertEqual(3, len(publish.combinations[0]))
+        self.assertTrue({Chip.from_str(c).id for c in ("k9", "r9")}.issubset(
+            publish.combinations[0]))
+        self.assertEqual(1, sink.of_type(events.Drop)[-1].player)
+        self.assertEqual(events.Win(publish.turn, 1), sink[-1])
+
+    def test_file_sink(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            with events.FileSink(path) as sink:
+                Game(2, seed=1, trace=sink).run()
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        finally:
+            os.remove(path)
+        self.assertEqual("GameStart", lines[0]["event"])
+        self.assertEqual(1, lines[0]["seed"])
+        self.assertEqual("Win", lines[-1]["event"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
+import random
 import unittest
 
 from pyrummy.chips import Chip, Book
-from pyrummy.game import Player, Game, Pool
+from pyrummy.game import Player, Game, Pool, GreedyEngine
+from pyrummy import events
+from pyrummy.rules import STANDARD
 
 
 class PlayerInitTestCase(unittest.TestCase):
@@ -20,14 +23,13 @@ class PlayerInitTestCase(unittest.TestCase):
 
     def test_hand(self):
         self.player.draw(Chip.from_str("k10"))
-        self.assertTrue(all([chip.location == 0 for chip in self.player._hand]))
+        self.assertIn(Chip.from_str("k10"), self.player._hand)
 
 class PlayerSimplePlayTestCase(unittest.TestCase):
     def test_yard(self):
         player = Player(0, [
             Chip.from_str("b8"), Chip.from_str("b7"),
-            Chip.from_str("r7"), Chip.from_str("y7")])
-        Game.THRESHOLD = 0
+            Chip.from_str("r7"), Chip.from_str("y7")], threshold=0)
         player.play()
         book = player._yard[0]
         self.assertEqual(1, len(player._yard))
@@ -45,7 +47,6 @@ class PlayerSimplePlayTestCase(unittest.TestCase):
             Chip.from_str("b8"), Chip.from_str("y8"),
             Chip.from_str("y7"), Chip.from_str("y6"),
             Chip.from_str("k11"), Chip.from_str("b2"), Chip.from_str("b1")])
-        Game.THRESHOLD = 40
         player.play()
         combi = player._yard[0]
         # algorithm picks either r987 or rby8
@@ -55,8 +56,8 @@ class PlayerSimplePlayTestCase(unittest.TestCase):
     def test_yard_double_chip(self):
         player = Player(0, [
             Chip.from_str("y2", index=0), Chip.from_str("y3"), Chip.from_str("y4"),
-            Chip.from_str("y2", index=1), Chip.from_str("r2"), Chip.from_str("k2")])
-        Game.THRESHOLD = 10
+            Chip.from_str("y2", index=1), Chip.from_str("r2"), Chip.from_str("k2")],
+            threshold=10)
         player.play()
         self.assertEqual(2, len(player._yard))
         self.assertEqual(0, len(player._hand))
@@ -64,8 +65,8 @@ class PlayerSimplePlayTestCase(unittest.TestCase):
     def test_below_threshold(self):
         player = Player(0, [
             Chip.from_str("y2", index=0), Chip.from_str("y3"), Chip.from_str("y4"),
-            Chip.from_str("y2", index=1), Chip.from_str("r2"), Chip.from_str("k2")])
-        Game.THRESHOLD = 20
+            Chip.from_str("y2", index=1), Chip.from_str("r2"), Chip.from_str("k2")],
+            threshold=20)
         player.play()
         self.assertEqual(0, len(player._yard))
         self.assertEqual(6, len(player._hand))
@@ -74,8 +75,8 @@ class PlayerSimplePlayTestCase(unittest.TestCase):
     #     player = Player(0, [
     #         Chip.from_str("r6"), Chip.from_str("y6"), Chip.from_str("k6"),
     #         Chip.from_str("r5"), Chip.from_str("r4"), Chip.from_str("r3"),
-    #         Chip.from_str("b9"), Chip.from_str("k7"), Chip.from_str("b1")])
-    #     Game.THRESHOLD = 15
+    #         Chip.from_str("b9"), Chip.from_str("k7"), Chip.from_str("b1")],
+    #         threshold=15)
     #     player.play()
     #     # the algorithm should pick r6543 since it holds more chips than ryk6
     #     self.assertEqual(1, len(player._yard))
@@ -109,11 +110,26 @@ class PlayerFindDropChipTestCase(unittest.TestCase):
 
     def test_find_from_combination(self):
         chips = [Chip.from_str("r10"), Chip.from_str("y10"), Chip.from_str("b10")]
-        player = Player(0, chips)
-        Game.THRESHOLD = 30
+        player = Player(0, chips, threshold=30)
         player.play()
         self.assertIsNone(player._drop_chip)
 
+class GreedyEngineTestCase(unittest.TestCase):
+    def test_duplicates(self):
+        # 7 starts, but starting from y6 and r6 results in the same
+        # constellation, as well as starting from r4, r3 and b1
+        hand = Chip.chips_from_str("r6", "y6", "k6", "r5", "r4", "r3", "b1")
+        constellations = GreedyEngine().constellations(hand)
+        self.assertEqual(len(set(constellations)), len(constellations))
+        self.assertEqual(4, len(constellations))
+        best = constellations[0]
+        self.assertEqual((6, 30), (best.size, best.value))
+        self.assertEqual(4, constellations[1].size)
+        self.assertEqual(best, GreedyEngine().constellations(hand)[0])
+        self.assertEqual(hash(best),
+                hash(GreedyEngine().constellations(hand)[0]))
+
+
 class PoolTestCase(unittest.TestCase):
     def test_default_generation(self):
         pool = Pool()
@@ -133,13 +149,29 @@ class PoolTestCase(unittest.TestCase):
             popped_chips.add(pool.pop_random_chip())
         self.assertSetEqual(set(chips), popped_chips)
 
+    def test_seeded_draws(self):
+        draws = []
+        for _ in range(2):
+            pool = Pool(rng=random.Random(42))
+            draws.append([pool.pop_random_chip() for _ in range(10)])
+            pool.append(draws[-1][0])
+            draws[-1].append(pool.pop_random_chip())
+        self.assertListEqual(draws[0], draws[1])
+
+    def test_draw_after_drop(self):
+        pool = Pool(Chip.chips_from_str("r1"), rng=random.Random(0))
+        chip = pool.pop_random_chip()
+        pool.append(chip)
+        self.assertIs(chip, pool.pop_random_chip())
+        self.assertEqual(0, len(pool))
+
 class GameTestCase(unittest.TestCase):
     def test_two_simple_players(self):
         hands = [Chip.chips_from_str("r11", "y5", "k2"),
                 Chip.chips_from_str("k9", "r9", "b1")]
         pool = Pool([Chip.from_str("y9", index=i) for i in range(2)])
-        game = Game(pool=pool, hands=hands)
-        Game.THRESHOLD = 25
+        game = Game(pool=pool, hands=hands,
+                rules=STANDARD._replace(players=2, threshold=25))
         # player 0 draws and drops, player 1 eventually draws y9 and wins
         game.run()
         self.assertEqual(1, game._current_player_index)
@@ -153,12 +185,53 @@ class GameTestCase(unittest.TestCase):
             "k1", "b1",
             "b12", "r5")]
         pool = Pool(Chip.chips_from_str("b13", "r1", "b3", "y7"))
-        game = Game(pool=pool, hands=hands)
-        Game.THRESHOLD = 31
+        game = Game(pool=pool, hands=hands,
+                rules=STANDARD._replace(players=1, threshold=31))
         game.run()
         self.assertEqual(3, len(game._winner._yard))
         self.assertSetEqual(set(pool),
                 set(Chip.chips_from_str("b3", "r5", "y7", "b12")))
 
+    def test_max_turns(self):
+        sink = events.MemorySink()
+        game = Game(4, seed=3, trace=sink, max_turns=5)
+        game.run()
+        self.assertEqual((None, 5, Game.MAX_TURNS), (game._winner,
+            game._turns, game.outcome))
+        self.assertEqual(events.End(5, Game.MAX_TURNS), sink[-1])
+        self.assertTrue(game.turn())
+        self.assertEqual(5, game._turns)
+
+    def test_pool_exhausted(self):
+        game = Game(pool=Pool([]), hands=[Chip.chips_from_str("r1", "k5")])
+        game.run()
+        self.assertEqual((0, Game.POOL_EXHAUSTED), (game._turns,
+            game.outcome))
+
+    def test_stalemate(self):
+        # r1 is the only chip without a partner and is dropped right after
+        # every draw
+        game = Game(pool=Pool(Chip.chips_from_str("r1")),
+                hands=[Chip.chips_from_str("k5", "k6", "y9", "y10")],
+                stalemate_rounds=3)
+        game.run()
+        self.assertEqual((3, Game.STALEMATE), (game._turns, game.outcome))
+        self.assertEqual(4, len(game._players[0]._hand))
+
+    def test_won(self):
+        game = Game(4, seed=3, max_turns=1000, stalemate_rounds=1000)
+        game.run()
+        self.assertEqual(Game.WON, game.outcome)
+        self.assertEqual(0, len(game._winner._hand))
+
+    def test_seed(self):
+        results = []
+        for _ in range(2):
+            game = Game(4, seed=7)
+            game.run()
+            results.append((game._winner._index, game._current_player_index,
+                [[c.id for c in p._hand] for p in game._players]))
+        self.assertEqual(results[0], results[1])
+
 if __name__ == "__main__":
     unittest.main()
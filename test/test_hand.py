@@ -0,0 +1,49 @@
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.hand import Hand
+from pyrummy.game import Player
+
+
+class HandTestCase(unittest.TestCase):
+    def setUp(self):
+        self.hand = Hand(Chip.chips_from_str("r2", "r4", "k4", "b9"))
+
+    def test_list(self):
+        self.assertListEqual(self.hand, Chip.chips_from_str("r2", "r4", "k4", "b9"))
+
+    def test_index(self):
+        r4 = Chip.from_str("r4")
+        self.assertIs(self.hand.chips[r4.id], self.hand[1])
+        self.assertEqual(1, self.hand.counts[r4.code_index])
+        self.assertTrue(self.hand.mask & (1 << r4.id))
+        # r2 and k4
+        self.assertEqual(2, self.hand.remote[r4.code_index])
+        self.assertEqual(0, self.hand.remote[Chip.from_str("b9").code_index])
+
+    def test_remove(self):
+        self.hand.remove(Chip.from_str("r4"))
+        self.hand.remove(Chip.from_str("k4"))
+        r4 = Chip.from_str("r4")
+        self.assertNotIn(r4.id, self.hand.chips)
+        self.assertEqual(0, self.hand.counts[r4.code_index])
+        self.assertFalse(self.hand.mask & (1 << r4.id))
+        self.assertEqual(0, self.hand.remote[Chip.from_str("r2").code_index])
+        self.assertEqual(1, self.hand.remote[r4.code_index])
+
+    def test_degrees(self):
+        self.assertListEqual(self.hand.degrees(self.hand), [1, 2, 1, 0])
+        self.assertListEqual(self.hand.degrees(self.hand[1:]), [1, 1, 0])
+
+
+class PlayerHandTestCase(unittest.TestCase):
+    def test_draw_drop(self):
+        player = Player(0, Chip.chips_from_str("r9", "k1"))
+        player.draw(Chip.from_str("r8"))
+        player.play()
+        self.assertEqual(Chip.from_str("k1"), player.drop())
+        self.assertEqual(2, sum(player._hand.counts))
+        self.assertEqual(set(player._hand.chips.values()), set(player._hand))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from pyrummy.game import Game
+from pyrummy.batch import simulate
+from pyrummy.instruments import Instruments
+
+
+class InstrumentsTestCase(unittest.TestCase):
+    def test_game(self):
+        instruments = Instruments()
+        game = Game(4, seed=2, instruments=instruments)
+        game.run()
+        calls = instruments.calls
+        self.assertEqual(1, calls["game"])
+        self.assertEqual(game._turns, calls["play"])
+        self.assertEqual(game._turns, calls["search"])
+        self.assertEqual(game._turns, calls["drop"])
+        self.assertEqual(game._turns + 4 * Game.HAND_START_SIZE,
+                calls["draw"])
+        self.assertGreater(instruments.seconds["game"],
+                instruments.seconds["play"])
+        self.assertGreaterEqual(instruments.maxima["hand_chips"],
+                Game.HAND_START_SIZE + 1)
+        self.assertGreater(instruments.totals["constellations"], 0)
+
+    def test_snapshot(self):
+        instruments = Instruments()
+        Game(4, seed=3, instruments=instruments).run()
+        snapshot = instruments.snapshot()
+        instruments.reset()
+        self.assertEqual({}, instruments.snapshot()["calls"])
+
+        instruments.merge(snapshot)
+        instruments.merge(snapshot)
+        self.assertEqual(2 * snapshot["calls"]["play"],
+                instruments.calls["play"])
+        self.assertEqual(snapshot["maxima"], dict(instruments.maxima))
+        report = instruments.report()
+        self.assertEqual(2, report["phases"]["game"]["calls"])
+        self.assertEqual(snapshot["totals"]["hand_chips"] /
+                snapshot["calls"]["play"],
+                report["quantities"]["hand_chips"]["mean"])
+
+    def test_simulate(self):
+        statistics = simulate(3, processes=1, instrumented=True)
+        self.assertEqual(3, statistics.instruments.calls["game"])
+        self.assertEqual(statistics.mean_turns * 3,
+                statistics.instruments.calls["play"])
+        self.assertIn("instruments", statistics.as_dict())
+        self.assertIsNone(simulate(1, processes=1).instruments)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Game
+from pyrummy.knowledge import Knowledge
+
+
+def expected(game, player):
+    """Unseen copies per code index, counted from scratch."""
+    unseen = len(player._knowledge.unseen) * [Chip.NR_DECKS]
+    for chip in player._hand:
+        unseen[chip.code_index] -= 1
+    for meld in game._yards:
+        for chip in meld:
+            unseen[chip.code_index] -= 1
+    return unseen
+
+
+class KnowledgeTestCase(unittest.TestCase):
+    def test_see_hide(self):
+        knowledge = Knowledge()
+        r5 = Chip.from_str("r5")
+        # r3, r4, r6, r7 and the other colors of 5, two decks each
+        self.assertEqual(14, knowledge.outs(r5))
+        knowledge.see(Chip.from_str("r4"))
+        knowledge.see(Chip.from_str("r4", index=1))
+        knowledge.see(Chip.from_str("y5"))
+        self.assertEqual(11, knowledge.outs(r5))
+        self.assertEqual(101, knowledge.total)
+        self.assertEqual(0, knowledge.probability(Chip.from_str("r4")))
+        knowledge.hide(Chip.from_str("r4"))
+        self.assertEqual(12, knowledge.outs(r5))
+        self.assertAlmostEqual(1 / 102,
+                knowledge.probability(Chip.from_str("r4")))
+
+    def test_game(self):
+        game = Game(4, seed=5)
+        game.start()
+        while not game.turn():
+            for player in game._players:
+                self.assertListEqual(expected(game, player),
+                        player._knowledge.unseen)
+        self.assertTrue(len(game._yards))
+
+    def test_restore(self):
+        game = Game(4, seed=5)
+        before = [list(p._knowledge.unseen) for p in game._players]
+        snapshot = game.snapshot()
+        while not game.turn():
+            pass
+        game.restore(snapshot)
+        self.assertListEqual(before,
+                [p._knowledge.unseen for p in game._players])
+
+if __name__ == "__main__":
+    unittest.main()
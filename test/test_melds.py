@@ -0,0 +1,55 @@
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Player, GreedyEngine
+from pyrummy.bitset import BitsetEngine
+from pyrummy.melds import CATALOG, BY_TOP
+
+
+def codes(*codes):
+    return tuple(sorted(chip.code_index for chip in
+        Chip.chips_from_str(*codes)))
+
+
+class CatalogTestCase(unittest.TestCase):
+    def test_catalog(self):
+        # 66 runs per color, 4 + 1 books per value
+        self.assertEqual(4 * 66 + 13 * 5, len(CATALOG))
+        self.assertEqual(len(CATALOG), len(set(m.codes for m in CATALOG)))
+        self.assertEqual(13, max(len(m.codes) for m in CATALOG))
+        self.assertEqual(3, min(len(m.codes) for m in CATALOG))
+        self.assertEqual(sum(range(1, 14)), max(m.value for m in CATALOG))
+
+    def test_index(self):
+        code = Chip.from_str("r5").code_index
+        self.assertIn(codes("r1", "r2", "r3", "r4", "r5"),
+                [m.codes for m in BY_TOP[code]])
+        self.assertNotIn(codes("r4", "r5", "r6"),
+                [m.codes for m in BY_TOP[code]])
+        self.assertIn(codes("r5", "y5", "b5", "k5"),
+                [m.codes for m in BY_TOP[code]])
+        lengths = [len(m.codes) for m in BY_TOP[code]]
+        self.assertEqual(sorted(lengths, reverse=True), lengths)
+
+
+class LongMeldsTestCase(unittest.TestCase):
+    def test_engines(self):
+        hand = Chip.chips_from_str("k13", "k12", "k11", "k10", "k9", "y5",
+                "r5", "b5", "k5", "r1")
+        for engine in (GreedyEngine(), BitsetEngine()):
+            best = max(engine.constellations(hand), key=lambda c: c.size)
+            self.assertEqual(9, best.size)
+            self.assertEqual([4, 5], sorted(len(c) for c in
+                best.combinations))
+            self.assertEqual(["r01"], [c.code for c in best.rest])
+
+    def test_publish(self):
+        player = Player(0, Chip.chips_from_str("k13", "k12", "k11", "k10",
+            "y1"))
+        player.play()
+        self.assertEqual([4], [len(c) for c in player._yard])
+        self.assertEqual(Chip.from_str("y1"), player.drop())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Player, Game
+from pyrummy.montecarlo import MonteCarloPlayer, rollout
+from pyrummy.rules import active
+
+
+class RolloutTestCase(unittest.TestCase):
+    def test_position(self):
+        game = Game(2, seed=3, player_classes=[MonteCarloPlayer, Player])
+        position = game._players[0].position()
+        self.assertEqual((14, 14), position.hand_sizes)
+        self.assertEqual(2 * 52 - 14, len(position.unknown))
+        self.assertFalse(set(position.hand) & set(position.unknown))
+
+    def test_rollout(self):
+        game = Game(2, seed=3, player_classes=[MonteCarloPlayer, Player])
+        player = game._players[0]
+        position = player.position()
+        drop = position.hand[0]
+        outcome = rollout(position, drop, 0, 50)
+        self.assertEqual(outcome, rollout(position, drop, 0, 50))
+        self.assertGreaterEqual(outcome.hand_value, 0)
+        # the game is left untouched
+        self.assertEqual(position, player.position())
+
+
+class MonteCarloPlayerTestCase(unittest.TestCase):
+    def test_without_game(self):
+        player = MonteCarloPlayer(0, Chip.chips_from_str("r1", "b5", "k9"))
+        player.play()
+        self.assertIn(player._drop_chip, player._hand)
+        self.assertEqual(0, player.rollouts)
+
+    def test_threshold(self):
+        hand = Chip.chips_from_str("r1", "r2", "r3", "b5", "k9")
+        self.assertEqual(20, MonteCarloPlayer(0, hand, threshold=20).threshold)
+        player = MonteCarloPlayer(0, hand, threshold=6)
+        player.play()
+        self.assertEqual(3, len(player._yard[0]))
+
+    def test_in_process(self):
+        game = Game(2, seed=5, player_classes=[
+            lambda *args, **kwargs: MonteCarloPlayer(*args, budget=0.01,
+                **kwargs), Player])
+        player = game._players[0]
+        game._pool.pop_random_chip()
+        player.play()
+        self.assertGreater(player.rollouts, 0)
+        self.assertIn(player._drop_chip, player._hand)
+
+    def test_threads(self):
+        with ThreadPoolExecutor(4) as executor:
+            game = Game(2, seed=5, player_classes=[
+                lambda *args, **kwargs: MonteCarloPlayer(*args, budget=0.1,
+                    executor=executor, max_turns=30, **kwargs), Player],
+                rules=active()._replace(players=2, threshold=30))
+            player = game._players[0]
+            game._pool.pop_random_chip()
+            position = player.position()
+            player.play()
+            # the rollouts running concurrently neither modify the game nor
+            # the class defaults of games
+            self.assertEqual(position.hand, tuple(chip.id for chip in
+                player._hand))
+            self.assertEqual(40, Game.THRESHOLD)
+        self.assertGreater(player.rollouts, 0)
+
+    def test_game(self):
+        with ProcessPoolExecutor(2) as executor:
+            game = Game(2, seed=7, player_classes=[
+                lambda *args, **kwargs: MonteCarloPlayer(*args, budget=0.005,
+                    executor=executor, max_turns=30, **kwargs), Player])
+            game.run()
+        self.assertIsNotNone(game._winner)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+
+from pyrummy import events
+from pyrummy.game import Game
+from pyrummy.record import RecordWriter, RecordReader, replay
+from pyrummy.rules import STANDARD, use
+
+
+class RecordTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.rec")
+
+    def tearDown(self):
+        self.directory.cleanup()
+        use(STANDARD)
+
+    def _record(self, seeds, rules=None, max_turns=None):
+        traces = []
+        with RecordWriter(self.path) as writer:
+            for seed in seeds:
+                sink = events.MemorySink()
+
+                def trace(event):
+                    sink(event)
+                    writer(event)
+
+                Game(4, seed=seed, trace=trace, rules=rules,
+                        max_turns=max_turns).run()
+                traces.append(list(sink))
+        return traces
+
+    def test_roundtrip(self):
+        traces = self._record([1, 2, None])
+        with RecordReader(self.path) as reader:
+            records = list(reader)
+            self.assertEqual(traces, [list(r.events()) for r in records])
+            self.assertEqual([1, 2, None], [r.seed for r in records])
+            self.assertEqual(traces[0][-1].player, records[0].winner())
+            self.assertEqual(Game.WON, records[0].outcome())
+            turns = list(records[0].turns())
+        self.assertEqual(traces[0][-1].turn, len(turns))
+        size = 5
+        for trace in traces:
+            size += 4 + 9 + 10 + 1 + 4 + 4 * 14
+            for event in trace[1:]:
+                size += {events.Draw: 3, events.Drop: 2, events.Win: 1,
+                        events.Publish: 2, events.LayOff: 3,
+                        events.End: 2}[type(event)]
+                if type(event) is events.Publish:
+                    size += sum(1 + len(c) for c in event.combinations)
+        self.assertEqual(size, os.path.getsize(self.path))
+
+    def test_replay(self):
+        traces = self._record([3])
+        with RecordReader(self.path) as reader:
+            record = next(iter(reader))
+            sink = events.MemorySink()
+            game = replay(record, trace=sink)
+            self.assertEqual(traces[0], list(sink))
+            self.assertEqual(traces[0][-1].player, game._winner._index)
+
+            game = replay(record, until=5)
+        self.assertEqual(5, game._turns)
+        played = Game(4, seed=3)
+        for _ in range(5):
+            played.turn()
+        self.assertEqual([sorted(c.id for c in p._hand) for p in
+            played._players], [sorted(c.id for c in p._hand) for p in
+                game._players])
+
+    def test_outcome(self):
+        traces = self._record([1, 2], max_turns=5)
+        with RecordReader(self.path) as reader:
+            records = list(reader)
+            self.assertEqual(traces, [list(r.events()) for r in records])
+            self.assertEqual([Game.MAX_TURNS] * 2, [r.outcome() for r in
+                records])
+            sink = events.MemorySink()
+            game = replay(records[0], trace=sink)
+            self.assertEqual(traces[0], list(sink))
+            self.assertEqual((5, Game.MAX_TURNS), (game._turns, game.outcome))
+            self.assertIsNone(replay(records[0], until=3).outcome)
+
+    def test_rules(self):
+        rules = STANDARD._replace(decks=3, colors=5, max_value=9, players=3,
+                threshold=30)
+        use(rules)
+        traces = self._record([4], rules)
+        with RecordReader(self.path) as reader:
+            record = next(iter(reader))
+            self.assertEqual(rules, record.rules)
+            sink = events.MemorySink()
+            game = replay(record, trace=sink)
+        self.assertEqual(traces[0], list(sink))
+        self.assertEqual(rules, game.rules)
+
+    def test_too_many_chips(self):
+        use(STANDARD._replace(decks=5))
+        with RecordWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                Game(4, seed=1, trace=writer).start()
+
+    def test_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"nothing to see here")
+        with self.assertRaises(ValueError):
+            RecordReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest import mock
+
+from pyrummy.bitset import BitsetEngine
+from pyrummy.chips import Chip
+from pyrummy.game import Game
+from pyrummy import melds
+from pyrummy.rules import STANDARD, use, validate
+
+
+class RuleSetTestCase(unittest.TestCase):
+    def tearDown(self):
+        use(STANDARD)
+
+    def test_validate(self):
+        validate(STANDARD)
+        for invalid in (STANDARD._replace(decks=0),
+                STANDARD._replace(colors=len(Chip.COLOR_CODES) + 1),
+                STANDARD._replace(min_value=5, max_value=4),
+                STANDARD._replace(players=8)):
+            self.assertRaises(ValueError, validate, invalid)
+
+    def test_use(self):
+        use(STANDARD._replace(decks=3, colors=5, max_value=9))
+        self.assertEqual(3, Chip.NR_DECKS)
+        chip = Chip.from_str("g9", index=2)
+        self.assertEqual(5 * 9 * 3 - 1, chip.id)
+        self.assertIs(chip, Chip.from_id(chip.id))
+        self.assertEqual("g09", chip.code)
+        # runs of 3 to 9 values per color, books of 3 to 5 colors per value;
+        # the tables are rebuilt, hence they are looked up via their module
+        self.assertEqual(5 * 28 + 9 * 16, len(melds.CATALOG))
+
+        use(STANDARD)
+        self.assertEqual(103, Chip.from_str("k13", index=1).id)
+        self.assertEqual(4 * 66 + 13 * 5, len(melds.CATALOG))
+
+    def test_game(self):
+        rules = STANDARD._replace(decks=4, players=10, hand_size=10,
+                threshold=30)
+        # the chips are not switched implicitly
+        self.assertRaises(ValueError, Game, rules=rules)
+        self.assertEqual(2, Chip.NR_DECKS)
+        # other rules with the active chips
+        self.assertEqual(2, Game(rules=STANDARD._replace(players=2))
+                ._nr_players)
+        use(rules)
+        game = Game(seed=1, rules=rules, engine=BitsetEngine())
+        self.assertIs(rules, game.rules)
+        self.assertEqual(30, game.threshold)
+        self.assertEqual(4 * 52 - 10 * 10, len(game._pool))
+        game.start()
+        while not game.turn():
+            pass
+        self.assertTrue(game._yards)
+
+    def test_defaults(self):
+        game = Game(2, seed=1)
+        with mock.patch.object(Game, "THRESHOLD", 25):
+            self.assertEqual(STANDARD._replace(players=2, threshold=25),
+                    game.rules)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from pyrummy.chips import Chip, combination
+from pyrummy.game import Player, Game, Pool
+from pyrummy.server import Server, Table, apply_decision, bot_client
+
+
+def ids(*codes):
+    return [chip.id for chip in Chip.chips_from_str(*codes)]
+
+
+class ApplyDecisionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.player = Player(0, Chip.chips_from_str("r9", "r8", "r7", "b7",
+            "y7", "k7", "k1"), threshold=20)
+
+    def test_valid(self):
+        apply_decision(self.player, [ids("r7", "r8", "r9"),
+            ids("b7", "y7", "k7")], ids("k1")[0])
+        self.assertEqual(2, len(self.player._yard))
+        self.assertEqual(Chip.from_str("k1"), self.player._drop_chip)
+        self.assertEqual(Player.PUBLISHED, self.player._status)
+
+    def test_invalid(self):
+        for publish, drop in (
+                ([ids("r7", "r8", "k7")], ids("k1")[0]),
+                ([ids("r7", "r9", "b7")], ids("k1")[0]),
+                ([ids("r7", "r8")], ids("k1")[0]),
+                ([ids("r7", "r8", "r9")], ids("r9")[0]),
+                ([ids("r7", "r8", "r9")], ids("b1")[0]),
+                ([], None)):
+            with self.assertRaises(ValueError):
+                apply_decision(self.player, publish, drop)
+        self.assertEqual(7, len(self.player._hand))
+
+    def test_malformed(self):
+        for publish, drop in (
+                ([5], None),
+                (None, ids("k1")[0]),
+                ([[True, False, True]], ids("k1")[0]),
+                ([ids("r7", "r8") + [[1]]], ids("k1")[0]),
+                ({"r": 1}, ids("k1")[0]),
+                ([], [1]),
+                ([], "k1")):
+            with self.assertRaises(ValueError):
+                apply_decision(self.player, publish, drop)
+        self.assertEqual(7, len(self.player._hand))
+
+    def test_lay_offs(self):
+        game = Game(pool=Pool(Chip.chips_from_str("b1")), hands=[
+            Chip.chips_from_str("r7", "r8", "r9", "r10", "r11", "k1", "k2"),
+            Chip.chips_from_str("y5", "b5", "k5", "r1")])
+        player, other = game._players
+        other._publish([combination(*Chip.chips_from_str("y5", "b5", "k5"))])
+        player._publish([combination(*Chip.chips_from_str("r7", "r8",
+            "r9"))])
+        r10, r11 = ids("r10", "r11")
+        for lay_offs in ([[r11, 1], [r10, 1]], [[r10, 0]], [[r10, 2]],
+                [[r10, 1], [r10, 1]], [[ids("b1")[0], 1]], [[r10]],
+                [[r10, True]], "r10"):
+            with self.assertRaises(ValueError):
+                apply_decision(player, [], ids("k1")[0], lay_offs)
+        # the drop must not be laid off
+        with self.assertRaises(ValueError):
+            apply_decision(player, [], r10, [[r10, 1]])
+        self.assertEqual(4, len(player._hand))
+
+        # laying off r10 lets the run accept r11
+        apply_decision(player, [], ids("k1")[0], [[r10, 1], [r11, 1]])
+        self.assertEqual([7, 8, 9, 10, 11], [c.value for c in game._yards[1]])
+        self.assertEqual([game._yards[1]], player._yard)
+        self.assertEqual(Chip.chips_from_str("k1", "k2"), list(player._hand))
+
+    def test_lay_offs_before_publishing(self):
+        game = Game(pool=Pool(Chip.chips_from_str("b1")), hands=[
+            Chip.chips_from_str("r10", "k1"),
+            Chip.chips_from_str("r7", "r8", "r9", "r1")])
+        game._players[1]._publish([combination(*Chip.chips_from_str("r7",
+            "r8", "r9"))])
+        with self.assertRaises(ValueError):
+            apply_decision(game._players[0], [], ids("k1")[0],
+                    [[ids("r10")[0], 0]])
+
+    def test_threshold(self):
+        player = Player(0, Chip.chips_from_str("r9", "r8", "r7", "k1"))
+        with self.assertRaises(ValueError):
+            apply_decision(player, [ids("r7", "r8", "r9")], ids("k1")[0])
+        # the threshold of a player overrides the default
+        player = Player(0, Chip.chips_from_str("r9", "r8", "r7", "k1"),
+                threshold=20)
+        apply_decision(player, [ids("r7", "r8", "r9")], ids("k1")[0])
+        self.assertEqual(Player.PUBLISHED, player._status)
+
+
+class ServerTestCase(unittest.TestCase):
+    def test_bot_tables(self):
+        results = asyncio.run(Server(max_tables=3).play_bots(range(6)))
+        self.assertEqual(list(range(6)), [r.seed for r in results])
+        for result in results:
+            game = Game(4, seed=result.seed)
+            game.run()
+            self.assertEqual((game._winner._index, game._turns),
+                    (result.winner, result.turns))
+
+    def _remote(self, client, timeout=10.0):
+        async def run():
+            server = Server(nr_players=2, timeout=timeout, seed=1)
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "socket")
+                listener = await server.serve(path=path)
+                reader, writer = await asyncio.open_unix_connection(path)
+                end = await client(reader, writer)
+                listener.close()
+                await listener.wait_closed()
+            return end, server.results[0]
+        return asyncio.run(run())
+
+    def test_remote_client(self):
+        end, result = self._remote(bot_client)
+        self.assertEqual((end["winner"], end["turns"], end["outcome"]),
+                (result.winner, result.turns, Game.WON))
+        self.assertEqual((0, 0), (result.timeouts, result.faults))
+
+    def test_timeout(self):
+        async def silent(reader, writer):
+            turns = 0
+            while True:
+                message = json.loads(await reader.readline())
+                if message["type"] == "end":
+                    return turns
+                turns += 1
+
+        turns, result = self._remote(silent, timeout=0.001)
+        self.assertEqual(turns, result.timeouts)
+        self.assertGreater(turns, 0)
+
+    def test_positions(self):
+        async def collect(reader, writer):
+            messages = []
+            while True:
+                message = json.loads(await reader.readline())
+                if message["type"] == "end":
+                    return messages
+                messages.append(message)
+
+        messages, _ = self._remote(collect, timeout=0.001)
+        for message in messages:
+            self.assertEqual([len(yard) for yard in message["yards"]],
+                    [len(positions) for positions in message["positions"]])
+            positions = sorted(p for ps in message["positions"] for p in ps)
+            self.assertEqual(list(range(len(positions))), positions)
+        self.assertTrue(messages[-1]["positions"][0] or
+                messages[-1]["positions"][1])
+
+    def test_garbage(self):
+        async def garbage(reader, writer):
+            payloads = [{"publish": [5]}, {"publish": None}, {"drop": [1]},
+                    {"publish": [[None]], "drop": {}}]
+            turns = 0
+            while True:
+                message = json.loads(await reader.readline())
+                if message["type"] == "end":
+                    return turns
+                answer = dict(payloads[turns % len(payloads)],
+                        turn=message["turn"])
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+                turns += 1
+
+        turns, result = self._remote(garbage)
+        self.assertEqual(turns, result.faults)
+        self.assertGreater(turns, 0)
+        self.assertEqual(Game.WON, result.outcome)
+
+    def test_max_turns(self):
+        result = asyncio.run(Table(max_turns=5, seed=1).run())
+        self.assertEqual((None, 5, Game.MAX_TURNS), (result.winner,
+            result.turns, result.outcome))
+
+    def test_invalid_table(self):
+        with self.assertRaises(ValueError):
+            Table(2, seats=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
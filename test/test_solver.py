@@ -0,0 +1,79 @@
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Player
+from pyrummy.solver import OptimalEngine, hand_key
+
+
+class HandKeyTestCase(unittest.TestCase):
+    def test_counts(self):
+        key = hand_key(Chip.chips_from_str("y1", "k13") +
+                [Chip.from_str("k13", index=1)])
+        self.assertEqual((1, 2), (key[0], key[51]))
+        self.assertEqual(3, sum(key))
+
+    def test_ignores_index(self):
+        self.assertEqual(hand_key([Chip.from_str("r3", index=0)]),
+                hand_key([Chip.from_str("r3", index=1)]))
+
+
+class OptimalEngineTestCase(unittest.TestCase):
+    def test_unknown_objective(self):
+        self.assertRaises(ValueError, OptimalEngine, "speed")
+
+    def test_long_run(self):
+        hand = Chip.chips_from_str("r3", "r4", "r5", "r6", "r7", "k1")
+        constellation, = OptimalEngine().constellations(hand)
+        self.assertEqual(5, constellation.size)
+        self.assertEqual(25, constellation.value)
+        self.assertListEqual(constellation.rest, [Chip.from_str("k1")])
+
+    def test_four_chip_book(self):
+        hand = [Chip(color, 9) for color in range(Chip.NR_COLORS)]
+        constellation, = OptimalEngine().constellations(hand)
+        self.assertEqual(1, len(constellation.combinations))
+        self.assertEqual(36, constellation.value)
+
+    def test_objectives(self):
+        # y1 r1 b1 + y2345 holds more chips, y123 + y345 is worth more
+        hand = Chip.chips_from_str("y1", "y2", "y3", "y4", "y5", "r1", "b1")
+        hand.append(Chip.from_str("y3", index=1))
+        by_size, most_valuable = OptimalEngine("size").constellations(hand)
+        by_value, = OptimalEngine("value").constellations(hand)
+        self.assertEqual((7, 17), (by_size.size, by_size.value))
+        self.assertEqual((6, 18), (by_value.size, by_value.value))
+        self.assertEqual(by_value, most_valuable)
+
+    def test_cache(self):
+        engine = OptimalEngine(cache_size=8)
+        hand = Chip.chips_from_str("r3", "r4", "r5", "y3", "b3")
+        engine.constellations(hand)
+        engine.constellations(hand)
+        self.assertGreater(engine.cache_info().hits, 0)
+        self.assertLessEqual(engine.cache_info().currsize, 8)
+
+
+class PlayerOptimalEngineTestCase(unittest.TestCase):
+    def test_best_constellation(self):
+        player = Player(0, [
+            Chip.from_str("r6"), Chip.from_str("y6"), Chip.from_str("k6"),
+            Chip.from_str("r5"), Chip.from_str("r4"), Chip.from_str("r3"),
+            Chip.from_str("b9"), Chip.from_str("k7"), Chip.from_str("b1")],
+            engine=OptimalEngine(), threshold=15)
+        player.play()
+        # ryk6 and r543 hold more chips than r6543 alone
+        self.assertEqual(2, len(player._yard))
+        self.assertEqual(3, len(player._hand))
+
+    def test_threshold(self):
+        # the largest partition (7 chips, value 17) is below the threshold,
+        # y123 + y345 reaches it
+        hand = Chip.chips_from_str("y1", "y2", "y3", "y4", "y5", "r1", "b1")
+        hand.append(Chip.from_str("y3", index=1))
+        player = Player(0, hand, engine=OptimalEngine(), threshold=18)
+        player.play()
+        self.assertEqual(Player.PUBLISHED, player._status)
+        self.assertEqual(18, sum(c.value for c in player._yard))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from pyrummy.game import Game
+from pyrummy.state import Journal
+
+
+def state(game):
+    return (game._current_player_index, game._winner, game._turns,
+            game._outcome, game._idle_turns, game._drawn, game._hand_size,
+            list(game._pool),
+            [(list(p._hand), list(p._hand.counts), p._hand.mask,
+                [list(c) for c in p._yard], p._status, p._drop_chip,
+                list(p._knowledge.unseen))
+                for p in game._players],
+            [sorted(c.id for c in meld) for meld in game._yards],
+            [sorted(positions) for positions in game._yards._accepting])
+
+
+class JournalTestCase(unittest.TestCase):
+    def test_rollback(self):
+        items = []
+        journal = Journal()
+        for i in range(3):
+            items.append(i)
+            journal.record(items.pop)
+        journal.rollback(1)
+        self.assertListEqual([0], items)
+        self.assertEqual(1, len(journal))
+
+
+class SnapshotTestCase(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(4, seed=3)
+
+    def test_restore(self):
+        game = self.game
+        for _ in range(5):
+            game.turn()
+        before = state(game)
+        snapshot = game.snapshot()
+        turns = 0
+        while not game.turn():
+            turns += 1
+        winner = game._winner._index
+        after = state(game)
+
+        game.restore(snapshot)
+        self.assertEqual(before, state(game))
+
+        # the same turns are replayed
+        while not game.turn():
+            pass
+        self.assertEqual(winner, game._winner._index)
+        self.assertEqual(after, state(game))
+
+    def test_nested(self):
+        game = self.game
+        first = game.snapshot()
+        initial = state(game)
+        game.turn()
+        second = game.snapshot()
+        intermediate = state(game)
+        for _ in range(3):
+            game.turn()
+        game.restore(second)
+        self.assertEqual(intermediate, state(game))
+        game.turn()
+        game.restore(first)
+        self.assertEqual(initial, state(game))
+
+    def test_within_turn(self):
+        # lookahead players snapshot after the draw of their turn
+        def play(explore):
+            game = Game(4, seed=11, stalemate_rounds=1)
+            idle_turns = []
+            for _ in range(30):
+                player = game.begin_turn()
+                player.play()
+                if explore:
+                    snapshot = game.snapshot()
+                    game.end_turn()
+                    game.turn()
+                    game.turn()
+                    game.restore(snapshot)
+                if game.end_turn():
+                    break
+                idle_turns.append(game._idle_turns)
+            return idle_turns
+
+        idle_turns = play(False)
+        self.assertGreater(max(idle_turns), 0)
+        self.assertEqual(idle_turns, play(True))
+
+    def test_release(self):
+        game = self.game
+        game.snapshot()
+        game.release()
+        game.turn()
+        self.assertIsNone(game._pool.journal)
+        self.assertTrue(all(p._hand.journal is None for p in game._players))
+
+if __name__ == "__main__":
+    unittest.main()
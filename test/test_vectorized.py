@@ -0,0 +1,68 @@
+import random
+import unittest
+
+from pyrummy.chips import Chip
+from pyrummy.game import Pool
+from pyrummy.solver import OptimalEngine
+
+try:
+    import numpy as np
+    from pyrummy.vectorized import encode, evaluate, extract_runs,\
+            extract_books
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, "NumPy not installed")
+class VectorizedTestCase(unittest.TestCase):
+    def test_encode(self):
+        counts = encode([Chip.chips_from_str("r2", "k13"),
+            [Chip.from_str("y1", index=i) for i in range(2)]])
+        self.assertEqual((2, Chip.NR_COLORS, 13), counts.shape)
+        self.assertEqual(1, counts[0, Chip.RED, 1])
+        self.assertEqual(1, counts[0, Chip.BLACK, 12])
+        self.assertEqual(2, counts[1, Chip.YELLOW, 0])
+        self.assertEqual(4, counts.sum())
+
+    def test_runs(self):
+        counts = encode([Chip.chips_from_str("r3", "r4", "r5", "r6", "r8",
+            "r9", "k1", "k2", "k3")]).astype(np.int16)
+        extract_runs(counts)
+        self.assertSetEqual({Chip.RED}, set(np.nonzero(counts[0])[0]))
+        self.assertEqual(2, counts.sum())
+
+    def test_books(self):
+        hand = [Chip(color, 7) for color in range(Chip.NR_COLORS)]
+        hand += Chip.chips_from_str("y8", "r8")
+        counts = encode([hand]).astype(np.int16)
+        extract_books(counts)
+        self.assertEqual(2, counts.sum())
+
+    def test_evaluate(self):
+        hands = [
+                Chip.chips_from_str("r9", "r8", "r7", "b8", "y8", "y7", "y6",
+                    "k11", "b2", "b1"),
+                Chip.chips_from_str("y2", "y3", "y4", "r2", "k2"),
+                Chip.chips_from_str("k13", "r1"),
+                ]
+        evaluation = evaluate(encode(hands), threshold=20)
+        # r987 and y876; y234
+        self.assertListEqual([45, 9, 0], list(evaluation.meld_value))
+        self.assertListEqual([22, 4, 14], list(evaluation.rest_value))
+        self.assertListEqual([True, False, False],
+                list(evaluation.can_publish))
+
+    def test_lower_bound(self):
+        rng = random.Random(0)
+        engine = OptimalEngine("value")
+        hands = []
+        for _ in range(200):
+            chips = list(Pool())
+            rng.shuffle(chips)
+            hands.append(chips[:rng.randint(10, 20)])
+        evaluation = evaluate(encode(hands))
+        for hand, value in zip(hands, evaluation.meld_value):
+            self.assertLessEqual(value, engine.constellations(hand)[0].value)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from pyrummy.chips import Chip, Run, Book
+from pyrummy.game import Player, Pool, Game
+from pyrummy.rules import STANDARD
+from pyrummy.yards import Yards
+
+
+class YardsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.yards = Yards()
+        self.yards.publish(0, Run(*Chip.chips_from_str("r3", "r4", "r5")))
+        self.yards.publish(1, Book(*Chip.chips_from_str("b9", "y9", "k9")))
+
+    def test_accepting(self):
+        yards = self.yards
+        self.assertEqual(0, yards.accepting(Chip.from_str("r2")))
+        self.assertEqual(0, yards.accepting(Chip.from_str("r6", index=1)))
+        self.assertEqual(1, yards.accepting(Chip.from_str("r9")))
+        self.assertIsNone(yards.accepting(Chip.from_str("y9")))
+        self.assertIsNone(yards.accepting(Chip.from_str("r7")))
+        self.assertEqual([0, 1], yards.owners)
+
+    def test_lay_off(self):
+        yards = self.yards
+        yards.lay_off(0, Chip.from_str("r6"))
+        self.assertEqual(0, yards.accepting(Chip.from_str("r7")))
+        self.assertEqual(["r03", "r04", "r05", "r06"],
+                [c.code for c in yards[0]])
+        yards.lay_off(0, Chip.from_str("r2"))
+        self.assertEqual("r02", yards[0][0].code)
+        yards.lay_off(1, Chip.from_str("r9"))
+        self.assertIsNone(yards.accepting(Chip.from_str("r9", index=1)))
+
+
+class PlayerLayOffTestCase(unittest.TestCase):
+    def test_lay_off(self):
+        game = Game(pool=Pool(Chip.chips_from_str("k13")), hands=[
+            Chip.chips_from_str("r9", "r8", "r7", "b7", "y7", "k7", "k1"),
+            Chip.chips_from_str("r10", "b4", "k6")],
+            rules=STANDARD._replace(players=2, threshold=20))
+        first, second = game._players
+        first.play()
+        first.drop()
+        self.assertEqual(2, len(game._yards))
+
+        # not published yet, no lay off
+        second.play()
+        self.assertEqual(3, len(second._hand))
+
+        second._status = Player.PUBLISHED
+        second.play()
+        self.assertEqual(["b04", "k06"], [c.code for c in second._hand])
+        self.assertEqual([3, 4], sorted(len(c) for c in game._yards))
+
+
+if __name__ == "__main__":
+    unittest.main()